@@ -3,6 +3,7 @@ export const ENDPOINTS = {
     CREATE_ROOM: '/v1/rooms/create_room',
     GET_ROOM: (id: string) => `/v1/rooms/get_room/${id}`,
     GET_ROOMS: '/v1/rooms/get_rooms',
+    JOIN_BY_CODE: (code: string) => `/v1/rooms/join/${encodeURIComponent(code)}`,
     START_GAME: '/v1/games/start_game',
     SUBMIT_MEAL: (id: string) => `/v1/games/${id}/submit_meal`,
     GET_GAME: (id: string) => `/v1/game/${id}`,
@@ -25,6 +25,7 @@ const HomePage: React.FC = () => {
   const [openModal, setOpenModal] = useState(false);
   const [roomName, setRoomName] = useState('');
   const [roomCode, setRoomCode] = useState('');
+  const [joinCode, setJoinCode] = useState('');
   const [availableRooms, setAvailableRooms] = useState<Room[]>([]);
 
   const navigate = useNavigate();
@@ -101,6 +102,32 @@ const HomePage: React.FC = () => {
     [navigate]
   );
 
+  const handleJoinByCode = useCallback(async () => {
+    const code = joinCode.trim();
+    if (!code) return;
+
+    try {
+      const response = await fetch(getApiUrl(ENDPOINTS.JOIN_BY_CODE(code)));
+      if (response.status === 404) {
+        alert('No room with this code.');
+        return;
+      }
+      if (!response.ok) throw new Error(`Error looking up room: ${response.statusText}`);
+      const room: Pick<Room, 'id' | 'name' | 'code'> = await response.json();
+
+      const activeResponse = await fetch(getApiUrl(ENDPOINTS.GET_IS_ACTIVE(room.id)));
+      if (!activeResponse.ok) throw new Error(`Error verifying room status: ${activeResponse.statusText}`);
+      if (await activeResponse.json()) {
+        alert('Room cannot be joined as a game is currently active.');
+        return;
+      }
+
+      navigate(`/room/${room.id}`, { state: { roomName: room.name, roomId: room.id } });
+    } catch (err) {
+      alert(err instanceof Error ? err.message : 'Unknown error');
+    }
+  }, [joinCode, navigate]);
+
   const handleOpenModal = () => {
     setOpenModal(true);
   };
@@ -151,11 +178,10 @@ const HomePage: React.FC = () => {
               required
             />
             <TextField
-              label="Enter room code"
+              label="Enter room code (optional)"
               value={roomCode}
               onChange={(e) => setRoomCode(e.target.value)}
               fullWidth
-              required
             />
             <Button
               type="submit"
@@ -173,6 +199,28 @@ const HomePage: React.FC = () => {
         </Box>
       </Modal>
 
+      {/* Join by code */}
+      <Stack
+        component="form"
+        direction="row"
+        spacing={1}
+        sx={{ marginBottom: '1rem' }}
+        onSubmit={(e: React.FormEvent<HTMLFormElement>) => {
+          e.preventDefault();
+          handleJoinByCode();
+        }}
+      >
+        <TextField
+          label="Room code"
+          size="small"
+          value={joinCode}
+          onChange={(e) => setJoinCode(e.target.value)}
+        />
+        <Button type="submit" variant="contained" disabled={!username || !joinCode.trim()}>
+          Join
+        </Button>
+      </Stack>
+
       {/* Available Rooms */}
       <StyledTypography
         variant="h5"
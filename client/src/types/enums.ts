@@ -7,4 +7,7 @@ export enum MessageType {
         ERROR = "ERROR",
         PLAYER_JOINED = "PLAYER_JOINED",
         PLAYER_LEFT = "PLAYER_LEFT",
+        PING = "PING",
+        PONG = "PONG",
+        RECONNECT = "RECONNECT",
 }
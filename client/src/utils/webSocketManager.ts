@@ -7,6 +7,15 @@ type Message = {
 
 type Listener = (data: any) => void;
 
+// Commands the server deduplicates by idempotency_key, with the reply that
+// acknowledges each. Unacknowledged commands are resent after a reconnect.
+const ACKNOWLEDGED_BY: { [type: string]: string } = {
+  START_GAME: "GAME_STARTED",
+  SPIN: "SPINED",
+  END_GAME: "GAME_ENDED",
+  SUBMIT_MEAL: "MEAL_SUBMITTED",
+};
+
 export const createWebSocketManager = (roomId: string, player: string) => {
   const listeners: { [key: string]: Listener[] } = {};
   let connectionListeners: Listener[] = [];
@@ -15,6 +24,9 @@ export const createWebSocketManager = (roomId: string, player: string) => {
   const maxRetries = 5;
   let retryCount = 0;
   const maxDelay = 5000;
+  let unacknowledged: Message[] = [];
+  // Set by the server's RECONNECT before it closes the socket for a restart.
+  let reconnectAfterMs: number | null = null;
 
   const onConnectionChange = (callback: Listener) => {
     connectionListeners.push(callback);
@@ -35,8 +47,8 @@ export const createWebSocketManager = (roomId: string, player: string) => {
 
     socket.onopen = () => {
       isConnected = true;
-      retryCount = 0;
       send({ type: "REJOIN", player, roomId });
+      unacknowledged.forEach((message) => socket?.send(JSON.stringify(message)));
       emitConnectionChange();
     };
 
@@ -44,6 +56,20 @@ export const createWebSocketManager = (roomId: string, player: string) => {
       isConnected = false;
       console.warn("WebSocket connection closed:", event.reason);
       emitConnectionChange();
+      if (event.code === 1008) {
+        // Rejected by admission control (e.g. the room is full), retrying won't help.
+        console.error("Connection refused by the server:", event.reason);
+        return;
+      }
+      if (reconnectAfterMs !== null) {
+        // Planned restart: come back once the new server is up, without
+        // using up the retries meant for failures.
+        const delay = reconnectAfterMs;
+        reconnectAfterMs = null;
+        console.log(`Server restarting, reconnecting in ${delay / 1000}s...`);
+        setTimeout(connect, delay);
+        return;
+      }
       if (retryCount < maxRetries) {
         retryCount++;
         const delay = Math.min(1000 * retryCount, maxDelay);
@@ -65,8 +91,21 @@ export const createWebSocketManager = (roomId: string, player: string) => {
     };
 
     socket.onmessage = (event) => {
-      console.log("Received message:", event.data);
+      // Admission control accepts and immediately closes rejected sockets,
+      // so only a message proves the connection and resets the backoff.
+      retryCount = 0;
       const message: Message = JSON.parse(event.data);
+      if (message.type === MessageType.PING.valueOf()) {
+        // Server heartbeat, answer so the connection is not reaped as idle.
+        send({ type: MessageType.PONG });
+        return;
+      }
+      if (message.type === MessageType.RECONNECT.valueOf()) {
+        reconnectAfterMs = message.retry_after_ms ?? 1000;
+        return;
+      }
+      console.log("Received message:", event.data);
+      acknowledge(message);
       if (listeners[message.type]) {
         console.log("Message type:", message.type);
         listeners[message.type].forEach((callback) => callback(message));
@@ -81,9 +120,31 @@ export const createWebSocketManager = (roomId: string, player: string) => {
     };
   };
 
+  const acknowledge = (message: Message) => {
+    if (message.type === MessageType.GAME_RESET.valueOf()) {
+      // Commands of a finished game are stale, including ones that failed.
+      unacknowledged = [];
+      return;
+    }
+    const index = unacknowledged.findIndex(
+      (command) =>
+        ACKNOWLEDGED_BY[command.type] === message.type &&
+        (message.player === undefined || message.player === player)
+    );
+    if (index >= 0) {
+      unacknowledged.splice(index, 1);
+    }
+  };
+
   const send = (message: Message) => {
+    if (ACKNOWLEDGED_BY[message.type] && !message.idempotency_key) {
+      message = { ...message, idempotency_key: crypto.randomUUID() };
+      unacknowledged.push(message);
+    }
     if (isConnected && socket && socket.readyState === WebSocket.OPEN) {
       socket.send(JSON.stringify(message));
+    } else if (ACKNOWLEDGED_BY[message.type]) {
+      console.warn("WebSocket is not open, the command is sent after reconnecting.");
     } else {
       console.error("WebSocket is closed or not open.");
     }
@@ -1,22 +1,88 @@
-import uvicorn
+import asyncio
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse, RedirectResponse
 from contextlib import asynccontextmanager
+from pathlib import Path
 
-from lunch_app.router import games, rooms, ws
-from lunch_app.database import setup_database
+from lunch_app.modules.log_config import setup_logging, shutdown_logging
+from lunch_app.modules.tracing import TracingMiddleware
+from lunch_app.modules.types.constants import ADMIN_TOKEN, SNAPSHOT_PATH, STARTUP_BUDGET_MODE, STORAGE_BACKEND
+
+async def drain():
+    """Stop background work and hand the live rooms over to the next process.
+
+    Run by DrainingServer while the WebSockets are still open; the lifespan
+    shutdown calls it again, which only writes the snapshot if it did not run.
+    """
+    from lunch_app.router.ws import manager
+
+    await manager.stop_heartbeat()
+    # Armed deadlines are kept in the room snapshot and rescheduled on restore.
+    await manager.timers.stop()
+    await manager.drain(Path(SNAPSHOT_PATH))
+    await manager.spectators.stop()
+
+def include_routers(app: FastAPI):
+    """Mount the API routers; later calls do nothing.
+
+    Runs at startup instead of at import: the routers pull in SQLAlchemy, the
+    models and the storage backends, most of the app's import time.
+    """
+    if getattr(app.state, "routers_included", False):
+        return
+    from lunch_app.router import games, health, rooms, ws
+
+    app.include_router(rooms.router)
+    app.include_router(games.router)
+    app.include_router(ws.router)
+    app.include_router(health.router)
+
+    if ADMIN_TOKEN:
+        # Admin endpoints reject every request without a token, skip loading them.
+        from lunch_app.router import admin
+        app.include_router(admin.router)
+    app.state.routers_included = True
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # TODO: Should not be here. We should have migrations instead
-    await setup_database()
+    setup_logging()
+    include_routers(app)
+    from lunch_app.database import setup_database
+    from lunch_app.modules.archiver import Archiver
+    from lunch_app.modules.schemas.messages import prewarm_messages
+    from lunch_app.modules.storage.provider import get_storage
+    from lunch_app.router.ws import admission, event_log, manager, schedule_restored_deadlines
+
+    uses_database = STORAGE_BACKEND == 'sql'
+    if STARTUP_BUDGET_MODE:
+        # Schema is expected to exist already; warm up once the app accepts connections.
+        asyncio.get_running_loop().call_soon(prewarm_messages)
+    else:
+        if uses_database:
+            # TODO: Should not be here. We should have migrations instead
+            await setup_database()
+        prewarm_messages()
+    manager.load_snapshot(Path(SNAPSHOT_PATH))
+    archiver = Archiver()
+    if uses_database:
+        archiver.start()
+    manager.start_heartbeat()
+    manager.timers.start()
+    schedule_restored_deadlines()
+    manager.spectators.start()
+    admission.lag_monitor.start()
+    event_log.start()
     yield
+    await drain()
+    await manager.actors.stop()
+    await admission.lag_monitor.stop()
+    await event_log.stop()
+    await archiver.stop()
+    await get_storage().close()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
-
-app.include_router(rooms.router)
-app.include_router(games.router)
-app.include_router(ws.router)
+app.add_middleware(TracingMiddleware)
 
 @app.get("/", include_in_schema=False)
 async def redirect_root_to_openapi():
@@ -31,4 +97,23 @@ async def hello_world():
     )
 
 if __name__ == '__main__':
-    uvicorn.run(app, host='0.0.0.0', port=8000, log_level="info", loop='asyncio')
+    import os
+    import uvicorn
+    from lunch_app.modules.compression import websocket_server_options
+    from lunch_app.modules.server import DrainingServer
+
+    # The custom WebSocket protocol and the drain before uvicorn closes the
+    # sockets are only available programmatically, not through the uvicorn
+    # CLI; run the app with `python -m lunch_app.app`.
+    options = dict(
+        host='0.0.0.0',
+        port=int(os.environ.get("PORT", 8000)),
+        log_level="info",
+        loop='asyncio',
+        **websocket_server_options(),
+    )
+    if os.environ.get("UVICORN_RELOAD", "false").lower() == "true":
+        # The reloader runs its own server; rooms are only snapshotted, not drained.
+        uvicorn.run("lunch_app.app:app", reload=True, **options)
+    else:
+        DrainingServer(uvicorn.Config(app, **options), drain).run()
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+def _export(args: argparse.Namespace) -> None:
+    from lunch_app.modules.bulk_copy import export_tables
+    asyncio.run(export_tables(Path(args.directory), fmt=args.format, compress=args.gzip))
+
+def _import(args: argparse.Namespace) -> None:
+    from lunch_app.modules.bulk_copy import import_tables
+    asyncio.run(import_tables(Path(args.directory), fmt=args.format, truncate=args.truncate))
+
+def _replay(args: argparse.Namespace) -> None:
+    from lunch_app.modules.event_log import read_db_events, read_file_events
+    from lunch_app.modules.replay import replay
+
+    async def run():
+        if args.source == 'db':
+            recorded = await read_db_events(args.room)
+        else:
+            recorded = read_file_events(Path(args.source))
+            if args.room:
+                recorded = (event for event in recorded if event["room_id"] == args.room)
+        return await replay(recorded, with_db=args.with_db, seed=args.seed)
+
+    stats = asyncio.run(run())
+    print(
+        f"events={stats.events} messages={stats.messages} "
+        f"frames={stats.frames} elapsed={stats.elapsed:.3f}s "
+        f"throughput={stats.messages_per_second:,.0f} msg/s"
+    )
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='lunch-app', description="Lunch Game App management commands.")
+    parser.add_argument('--log-level', default='INFO')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Bulk export rooms, games and meals with COPY.")
+    export_parser.add_argument('directory', help="Directory the table files are written to.")
+    export_parser.add_argument('--format', choices=['csv', 'binary'], default='csv')
+    export_parser.add_argument('--gzip', action='store_true', help="Gzip the exported files.")
+    export_parser.set_defaults(func=_export)
+
+    import_parser = subparsers.add_parser('import', help="Bulk import rooms, games and meals with COPY.")
+    import_parser.add_argument('directory', help="Directory containing the exported table files.")
+    import_parser.add_argument('--format', choices=['csv', 'binary'], default='csv')
+    import_parser.add_argument('--truncate', action='store_true', help="Empty the tables before importing.")
+    import_parser.set_defaults(func=_import)
+
+    replay_parser = subparsers.add_parser('replay', help="Replay a recorded WebSocket event log.")
+    replay_parser.add_argument('source', help="Path of a JSON lines event log, or 'db' for the game_events table.")
+    replay_parser.add_argument('--room', help="Only replay events of this room.")
+    replay_parser.add_argument('--with-db', action='store_true', help="Write games to the configured storage instead of memory.")
+    replay_parser.add_argument('--seed', type=int, default=0, help="Seed for SPIN scores and loser draws.")
+    replay_parser.set_defaults(func=_replay)
+
+    return parser
+
+def main() -> None:
+    args = build_parser().parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
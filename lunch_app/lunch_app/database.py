@@ -2,30 +2,56 @@ import re
 import logging
 from typing import AsyncIterator
 from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base 
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import declarative_base
 
-from lunch_app.modules.types.constants import DATABASE_URL
+from lunch_app.modules.tracing import instrument_engine
+from lunch_app.modules.types.constants import DATABASE_URL, DB_RESET_ON_STARTUP, SQL_ECHO
 
 log = logging.getLogger(__name__)
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is not set.")
+# The engine is created on first use, so importing the app neither needs a
+# configured database nor pays for engine setup.
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker | None = None
 
-if "+asyncpg" not in DATABASE_URL:
-    DATABASE_URL = re.sub(r'^postgresql', 'postgresql+asyncpg', DATABASE_URL)
+Base = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+def get_database_url() -> str:
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set.")
 
-SessionLocal = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-)
+    if "+asyncpg" not in DATABASE_URL:
+        return re.sub(r'^postgresql', 'postgresql+asyncpg', DATABASE_URL)
+    return DATABASE_URL
 
-Base = declarative_base()
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(get_database_url(), echo=SQL_ECHO)
+        instrument_engine(_engine)
+    return _engine
+
+def get_session_factory() -> async_sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            bind=get_engine(),
+            expire_on_commit=False,
+        )
+    return _session_factory
+
+async def dispose_engine() -> None:
+    if _engine is not None:
+        await _engine.dispose()
+
+def get_asyncpg_dsn() -> str:
+    """Return DATABASE_URL as a plain DSN usable by asyncpg.connect()."""
+    return re.sub(r'^postgresql\+asyncpg', 'postgresql', get_database_url())
 
 async def get_session() -> AsyncIterator[AsyncSession]:
-    async with SessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
         finally:
@@ -33,12 +59,35 @@ async def get_session() -> AsyncIterator[AsyncSession]:
 
 @asynccontextmanager
 async def get_session_context():
-    async with SessionLocal() as session:
+    async with get_session_factory()() as session:
         yield session
 
 # TODO: Should not be here. We should have migrations instead.
 async def setup_database() -> None:
     log.info("Setting up database.")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    async with get_engine().begin() as conn:
+        if DB_RESET_ON_STARTUP:
+            await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+
+def upgrade_schema(conn: Connection) -> None:
+    """Add the columns and indexes that tables of an older version miss.
+
+    create_all only creates missing tables and sequences, not what an existing
+    table lacks. Every step is idempotent, so this runs on each startup; new
+    columns have to be nullable.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} to an existing table.")
+            log.info("Adding column %s.%s.", table.name, column.name)
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}"))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from fastapi import status
+
+from lunch_app.modules.log_config import log_context, sampled
+from lunch_app.modules.types.constants import (
+    LOOP_LAG_INTERVAL_SECONDS,
+    READY_MAX_LOOP_LAG_SECONDS,
+    READY_MAX_QUEUE_DEPTH,
+    WS_ADMISSION_MAX_LOOP_LAG_SECONDS,
+    WS_MAX_CONNECTIONS,
+    WS_MAX_PLAYERS_PER_ROOM,
+    WS_MAX_ROOMS,
+    WS_MAX_SPECTATORS_PER_ROOM,
+)
+
+log = logging.getLogger(__name__)
+
+class Rejection(NamedTuple):
+    kind: str
+    code: int
+    reason: str
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task sleeping for `interval`."""
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            # Rises immediately, decays over a few intervals, so a single
+            # quick sample does not flip admission and readiness back and forth.
+            self.lag = lag if lag > self.lag else 0.7 * self.lag + 0.3 * lag
+
+class AdmissionController:
+    """Decides whether a new WebSocket may join, before it is accepted.
+
+    Sockets admitted but not yet registered by the room actor are counted as
+    pending, so a burst of connections cannot overshoot the limits.
+    """
+    def __init__(
+        self,
+        manager,
+        max_players_per_room: int = WS_MAX_PLAYERS_PER_ROOM,
+        max_rooms: int = WS_MAX_ROOMS,
+        max_connections: int = WS_MAX_CONNECTIONS,
+        max_loop_lag: float = WS_ADMISSION_MAX_LOOP_LAG_SECONDS,
+        max_spectators_per_room: int = WS_MAX_SPECTATORS_PER_ROOM,
+    ):
+        self.manager = manager
+        self.max_players_per_room = max_players_per_room
+        self.max_rooms = max_rooms
+        self.max_connections = max_connections
+        self.max_loop_lag = max_loop_lag
+        self.max_spectators_per_room = max_spectators_per_room
+        self.lag_monitor = LoopLagMonitor()
+        self.pending: Dict[str, int] = defaultdict(int)
+        self.pending_spectators: Dict[str, int] = defaultdict(int)
+        self.rejected: Counter = Counter()
+
+    def room_count(self) -> int:
+        return len(self.manager.active_connections.keys() | self.pending.keys())
+
+    def connection_count(self) -> int:
+        active = sum(len(connections) for connections in self.manager.active_connections.values())
+        spectators = self.manager.spectators.count() + sum(self.pending_spectators.values())
+        return active + sum(self.pending.values()) + spectators
+
+    def admit(self, room_id: str) -> Optional[Rejection]:
+        """Reserve a slot in the room, or return why the socket is refused."""
+        players = len(self.manager.active_connections.get(room_id, ())) + self.pending.get(room_id, 0)
+        new_room = players == 0
+
+        rejection = None
+        if self.manager.draining and new_room:
+            rejection = Rejection("draining", status.WS_1012_SERVICE_RESTART, "Server is restarting.")
+        elif self.max_connections and self.connection_count() >= self.max_connections:
+            rejection = Rejection("connections", status.WS_1013_TRY_AGAIN_LATER, "Server is at capacity.")
+        elif new_room and self.max_rooms and self.room_count() >= self.max_rooms:
+            rejection = Rejection("rooms", status.WS_1013_TRY_AGAIN_LATER, "No capacity for new rooms.")
+        elif self.max_players_per_room and players >= self.max_players_per_room:
+            rejection = Rejection("room_full", status.WS_1008_POLICY_VIOLATION, "Room is full.")
+        elif self.max_loop_lag and self.lag_monitor.lag > self.max_loop_lag:
+            rejection = Rejection("overloaded", status.WS_1013_TRY_AGAIN_LATER, "Server is overloaded.")
+
+        return self._reserve(room_id, rejection, self.pending)
+
+    def admit_spectator(self, room_id: str) -> Optional[Rejection]:
+        """Like `admit`, for a spectator: never opens a room, has its own per-room cap."""
+        spectators = self.manager.spectators.count(room_id) + self.pending_spectators.get(room_id, 0)
+
+        rejection = None
+        if self.manager.draining:
+            rejection = Rejection("draining", status.WS_1012_SERVICE_RESTART, "Server is restarting.")
+        elif self.max_connections and self.connection_count() >= self.max_connections:
+            rejection = Rejection("connections", status.WS_1013_TRY_AGAIN_LATER, "Server is at capacity.")
+        elif self.max_spectators_per_room and spectators >= self.max_spectators_per_room:
+            rejection = Rejection("spectators_full", status.WS_1008_POLICY_VIOLATION, "Too many spectators.")
+        elif self.max_loop_lag and self.lag_monitor.lag > self.max_loop_lag:
+            rejection = Rejection("overloaded", status.WS_1013_TRY_AGAIN_LATER, "Server is overloaded.")
+
+        return self._reserve(room_id, rejection, self.pending_spectators)
+
+    def _reserve(self, room_id: str, rejection: Optional[Rejection], pending: Dict[str, int]) -> Optional[Rejection]:
+        if rejection is not None:
+            self.rejected[rejection.kind] += 1
+            if sampled("admission"):
+                log.warning(
+                    "Refused connection to room_id %s: %s", room_id, rejection.reason,
+                    extra=log_context(room_id, category="admission"),
+                )
+            return rejection
+
+        pending[room_id] += 1
+        return None
+
+    def release(self, room_id: str, spectator: bool = False):
+        """Drop the reservation made by `admit` once the socket is registered or gone."""
+        pending = self.pending_spectators if spectator else self.pending
+        pending[room_id] -= 1
+        if pending[room_id] <= 0:
+            del pending[room_id]
+
+    def load(self) -> Dict:
+        return {
+            "connections": self.connection_count(),
+            "rooms": self.room_count(),
+            "spectators": self.manager.spectators.count(),
+            "loop_lag_ms": round(self.lag_monitor.lag * 1000, 1),
+            "queue_depth": self.manager.actors.queue_depth(),
+            "draining": self.manager.draining,
+            "rejected": dict(self.rejected),
+        }
+
+    def readiness(self, load: Dict) -> Tuple[bool, List[str]]:
+        """Whether a load balancer should send new connections here, and why not."""
+        reasons = []
+        if load["draining"]:
+            reasons.append("draining")
+        if self.max_connections and load["connections"] >= self.max_connections:
+            reasons.append("connection limit reached")
+        if self.max_rooms and load["rooms"] >= self.max_rooms:
+            reasons.append("room limit reached")
+        if load["loop_lag_ms"] > READY_MAX_LOOP_LAG_SECONDS * 1000:
+            reasons.append("event loop lagging")
+        if load["queue_depth"] > READY_MAX_QUEUE_DEPTH:
+            reasons.append("room queues backed up")
+        return not reasons, reasons
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lunch_app.database import get_session_context
+from lunch_app.modules.models.model import ArchivedGame, ArchivedMeal, Game, Meal
+from lunch_app.modules.types.constants import (
+    ARCHIVE_AFTER_SECONDS,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_INTERVAL_SECONDS,
+)
+
+log = logging.getLogger(__name__)
+
+def _copy_rows(source, target, condition):
+    """INSERT INTO target SELECT <same columns> FROM source WHERE condition."""
+    names = [column.name for column in target.__table__.columns]
+    source_columns = [source.__table__.c[name] for name in names]
+    return insert(target).from_select(names, select(*source_columns).where(condition))
+
+async def archive_batch(session: AsyncSession, cutoff: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move up to `batch_size` games that ended before `cutoff` into the archive tables."""
+    result = await session.execute(
+        select(Game.id)
+        .where(Game.is_active == False, Game.ended_at_utc < cutoff)
+        .order_by(Game.ended_at_utc)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    game_ids = result.scalars().all()
+    if not game_ids:
+        return 0
+
+    await session.execute(_copy_rows(Game, ArchivedGame, Game.id.in_(game_ids)))
+    await session.execute(_copy_rows(Meal, ArchivedMeal, Meal.game_id.in_(game_ids)))
+    await session.execute(delete(Meal).where(Meal.game_id.in_(game_ids)))
+    await session.execute(delete(Game).where(Game.id.in_(game_ids)))
+    await session.commit()
+    return len(game_ids)
+
+async def archive_finished_games(max_age_seconds: int = ARCHIVE_AFTER_SECONDS) -> int:
+    """Archive every finished game older than `max_age_seconds`, batch by batch."""
+    cutoff = int(datetime.now(timezone.utc).timestamp()) - max_age_seconds
+    total = 0
+    while True:
+        async with get_session_context() as session:
+            archived = await archive_batch(session, cutoff)
+        total += archived
+        if archived < ARCHIVE_BATCH_SIZE:
+            break
+    if total:
+        log.info("Archived %s finished games older than %s", total, cutoff)
+    return total
+
+class Archiver:
+    """Background task that periodically moves finished games to the archive."""
+    def __init__(self, interval: float = ARCHIVE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            # Sleep first so archiving never competes with startup.
+            await asyncio.sleep(self.interval)
+            try:
+                await archive_finished_games()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("Archiving finished games failed: %s", e)
@@ -0,0 +1,156 @@
+import gzip
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+import asyncpg  # type: ignore[import-untyped]
+
+from lunch_app.database import Base, get_asyncpg_dsn
+# Registers the tables on Base.metadata.
+from lunch_app.modules.models import model  # noqa: F401
+from lunch_app.modules.room_codes import decode_room_code, is_generated_shape
+
+log = logging.getLogger(__name__)
+
+# Parent tables first so foreign keys are satisfied on import.
+BULK_TABLES = ['game_rooms', 'games', 'meals', 'games_archive', 'meals_archive']
+
+# Added after the first exports; dumps without their files still import.
+OPTIONAL_TABLES = {'games_archive', 'meals_archive'}
+
+FORMATS = {'csv', 'binary'}
+
+# Last generated room code number, exported next to the tables.
+SEQUENCE_FILE = 'game_room_code_seq.txt'
+
+# Numbers handed out so far; 0 before the first nextval.
+LAST_CODE_NUMBER_QUERY = (
+    f"SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {model.room_code_sequence.name}"
+)
+
+def _table_columns(table: str) -> List[str]:
+    return [column.name for column in Base.metadata.tables[table].columns]
+
+def _file_path(directory: Path, table: str, fmt: str, compress: bool) -> Path:
+    suffix = '.csv' if fmt == 'csv' else '.bin'
+    if compress:
+        suffix += '.gz'
+    return directory / f"{table}{suffix}"
+
+def _open(path: Path, mode: str):
+    if path.suffix == '.gz':
+        # Small compress level keeps gzip from becoming the bottleneck.
+        return gzip.open(path, mode, compresslevel=1)
+    return open(path, mode)
+
+def _read_csv_header(path: Path) -> List[str]:
+    with _open(path, 'rt') as f:
+        return f.readline().strip().split(',')
+
+async def _last_code_number(conn: asyncpg.Connection, directory: Path) -> int:
+    """Highest room code number used by the imported rooms.
+
+    Dumps made before the sequence was exported fall back to decoding the
+    generated codes, which needs the same ROOM_CODE_SECRET as the export.
+    """
+    path = directory / SEQUENCE_FILE
+    if path.exists():
+        return int(path.read_text().strip())
+    codes = await conn.fetch("SELECT code FROM game_rooms")
+    return max((decode_room_code(row['code']) for row in codes if is_generated_shape(row['code'])), default=0)
+
+async def _restore_code_sequence(conn: asyncpg.Connection, directory: Path) -> int:
+    """Move the room code sequence past every imported room.
+
+    Without this the next generated code repeats an imported one and
+    create_room fails on the unique index. The sequence never goes back, so
+    codes of rooms that were truncated are not handed out again either.
+    """
+    number = max(await _last_code_number(conn, directory), await conn.fetchval(LAST_CODE_NUMBER_QUERY))
+    if number > 0:
+        await conn.execute(f"SELECT setval('{model.room_code_sequence.name}', $1)", number)
+    return number
+
+async def export_tables(directory: Path, fmt: str = 'csv', compress: bool = False) -> Dict[str, str]:
+    """Stream every bulk table into a file in `directory` using COPY TO.
+
+    Rows are written in chunks as Postgres produces them, so memory use does
+    not depend on table size. All tables are read from a single repeatable-read
+    snapshot, so the exported files are consistent with each other.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    results = {}
+    try:
+        async with conn.transaction(isolation='repeatable_read', readonly=True):
+            for table in BULK_TABLES:
+                path = _file_path(directory, table, fmt, compress)
+                with _open(path, 'wb') as f:
+                    status = await conn.copy_from_table(
+                        table,
+                        output=f,
+                        columns=_table_columns(table),
+                        format=fmt,
+                        header=True if fmt == 'csv' else None,
+                    )
+                results[table] = status
+                log.info("Exported %s to %s: %s", table, path, status)
+            number = await conn.fetchval(LAST_CODE_NUMBER_QUERY)
+            (directory / SEQUENCE_FILE).write_text(f"{number}\n")
+    finally:
+        await conn.close()
+    return results
+
+async def import_tables(directory: Path, fmt: str = 'csv', truncate: bool = False) -> Dict[str, str]:
+    """Load bulk table files from `directory` using COPY FROM.
+
+    Files are read in fixed size chunks by asyncpg, so memory use stays bounded
+    regardless of file size. The whole import runs in one transaction: either
+    every table is loaded or nothing is.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    files = {}
+    for table in BULK_TABLES:
+        candidates = [_file_path(directory, table, fmt, compress) for compress in (False, True)]
+        existing = [path for path in candidates if path.exists()]
+        if not existing and table in OPTIONAL_TABLES:
+            log.warning("No %s file found for table %s in %s, skipping it.", fmt, table, directory)
+            continue
+        if not existing:
+            raise FileNotFoundError(f"No {fmt} file found for table {table} in {directory}.")
+        files[table] = existing[0]
+
+    conn = await asyncpg.connect(get_asyncpg_dsn())
+    results = {}
+    try:
+        async with conn.transaction():
+            if truncate:
+                await conn.execute(f"TRUNCATE {', '.join(reversed(BULK_TABLES))}")
+            for table, path in files.items():
+                # CSV files carry their own header, which lets files exported
+                # from an older schema be loaded as long as the columns exist.
+                columns = _read_csv_header(path) if fmt == 'csv' else _table_columns(table)
+                with _open(path, 'rb') as f:
+                    status = await conn.copy_to_table(
+                        table,
+                        source=f,
+                        columns=columns,
+                        format=fmt,
+                        header=True if fmt == 'csv' else None,
+                    )
+                results[table] = status
+                log.info("Imported %s into %s: %s", path, table, status)
+            number = await _restore_code_sequence(conn, directory)
+            log.info("Room code sequence at %s", number)
+    finally:
+        await conn.close()
+    if truncate:
+        # The code cache lives in each app process, this one cannot reach it.
+        log.warning("Running app instances may still resolve codes of the replaced rooms; "
+                    "clear them with DELETE /v1/admin/room_code_cache.")
+    return results
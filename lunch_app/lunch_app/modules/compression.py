@@ -0,0 +1,98 @@
+from typing import Dict
+
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import CTRL_OPCODES, Frame, Opcode
+from websockets.server import ServerProtocol
+
+from lunch_app.modules.types.constants import (
+    WS_COMPRESSION_CLIENT_NO_CONTEXT_TAKEOVER,
+    WS_COMPRESSION_ENABLED,
+    WS_COMPRESSION_LEVEL,
+    WS_COMPRESSION_MAX_WINDOW_BITS,
+    WS_COMPRESSION_MEM_LEVEL,
+    WS_COMPRESSION_MIN_BYTES,
+    WS_COMPRESSION_SERVER_NO_CONTEXT_TAKEOVER,
+)
+
+try:
+    from uvicorn.protocols.websockets.websockets_sansio_impl import WebSocketsSansIOProtocol
+except ImportError:
+    # uvicorn before 0.35 (the one in poetry.lock) only has the protocol built
+    # on the legacy websockets server; the extension plugs into that instead.
+    WebSocketsSansIOProtocol = None  # type: ignore[assignment,misc]
+    from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that sends messages below `min_bytes` uncompressed.
+
+    Skipped messages leave the compressor untouched, so context takeover keeps
+    working for the messages that are compressed.
+    """
+    def __init__(self, *args, min_bytes: int = WS_COMPRESSION_MIN_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_bytes = min_bytes
+        self._skipping = False
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not Opcode.CONT:
+            # Decided once per message; continuation frames follow the first one.
+            self._skipping = len(frame.data) < self.min_bytes
+        if self._skipping:
+            return frame
+        return super().encode(frame)
+
+class ThresholdServerPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiates permessage-deflate and returns a ThresholdPerMessageDeflate."""
+    def __init__(self, *args, min_bytes: int = WS_COMPRESSION_MIN_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_bytes = min_bytes
+
+    def process_request_params(self, params, accepted_extensions):
+        # Raises NegotiationError for offers we cannot accept; websockets then
+        # tries the client's next offer and finally continues uncompressed.
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        return response_params, ThresholdPerMessageDeflate(
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings,
+            min_bytes=self.min_bytes,
+        )
+
+def deflate_factory() -> ThresholdServerPerMessageDeflateFactory:
+    """Build the extension factory from the WS_COMPRESSION_* settings."""
+    return ThresholdServerPerMessageDeflateFactory(
+        server_no_context_takeover=WS_COMPRESSION_SERVER_NO_CONTEXT_TAKEOVER,
+        client_no_context_takeover=WS_COMPRESSION_CLIENT_NO_CONTEXT_TAKEOVER,
+        server_max_window_bits=WS_COMPRESSION_MAX_WINDOW_BITS,
+        client_max_window_bits=WS_COMPRESSION_MAX_WINDOW_BITS,
+        compress_settings={"level": WS_COMPRESSION_LEVEL, "memLevel": WS_COMPRESSION_MEM_LEVEL},
+        min_bytes=WS_COMPRESSION_MIN_BYTES,
+    )
+
+if WebSocketsSansIOProtocol is not None:
+    class CompressedWebSocketProtocol(WebSocketsSansIOProtocol):
+        """uvicorn WebSocket protocol negotiating our permessage-deflate settings."""
+        def __init__(self, config, server_state, app_state, _loop=None):
+            super().__init__(config, server_state, app_state, _loop)
+            self.conn = ServerProtocol(
+                extensions=[deflate_factory()],
+                max_size=self.config.ws_max_size,
+                logger=self.conn.logger,
+            )
+else:
+    class CompressedWebSocketProtocol(WebSocketProtocol):  # type: ignore[no-redef]
+        """uvicorn WebSocket protocol negotiating our permessage-deflate settings."""
+        def __init__(self, config, server_state, app_state, _loop=None):
+            super().__init__(config, server_state, app_state, _loop)
+            # The legacy server reads the factories when the handshake arrives.
+            self.available_extensions = [deflate_factory()]
+
+def websocket_server_options() -> Dict:
+    """uvicorn.run() keyword arguments selecting the WebSocket protocol."""
+    if not WS_COMPRESSION_ENABLED:
+        return {"ws_per_message_deflate": False}
+    return {"ws": CompressedWebSocketProtocol, "ws_per_message_deflate": False}
@@ -1,8 +1,34 @@
-from fastapi import WebSocket
+from fastapi import WebSocket, status
 from typing import Dict, List
 from collections import defaultdict
 from pydantic import BaseModel
+import asyncio
 import logging
+import time
+from functools import partial
+from pathlib import Path
+
+from lunch_app.modules.log_config import log_context, sampled
+from lunch_app.modules.room_actor import Job, RoomActorRegistry
+from lunch_app.modules.schemas.messages import (
+    GameStateMessage,
+    PingMessage,
+    PlayerListMessage,
+    ReconnectNotification,
+    UserDisjoinedNotification,
+)
+from lunch_app.modules.snapshot import load_snapshot, write_snapshot
+from lunch_app.modules.spectators import SpectatorTier
+from lunch_app.modules.timer_wheel import Timer, TimerWheel
+from lunch_app.modules.tracing import span
+from lunch_app.modules.types.constants import (
+    DRAIN_TIMEOUT_SECONDS,
+    RECONNECT_AFTER_MS,
+    WS_HEARTBEAT_INTERVAL_SECONDS,
+    WS_IDLE_TIMEOUT_SECONDS,
+    WS_SEND_TIMEOUT_SECONDS,
+)
+from lunch_app.modules.types.enums import MessageType
 
 log = logging.getLogger(__name__)
 
@@ -10,6 +36,7 @@ class PlayerConnection:
     def __init__(self, websocket: WebSocket, player: str):
         self.websocket = websocket
         self.player = player
+        self.last_seen = time.monotonic()
 
 class ConnectionManager:
     def __init__(self):
@@ -18,11 +45,26 @@ class ConnectionManager:
         self.meal_submissions: Dict[str, set] = defaultdict(set)
         self.game_states: Dict[str, Dict] = {}
         self.scores: Dict[str, Dict[str, int]] = defaultdict(dict)
+        # number of connections evicted because they were idle or unreachable
+        self.reaped_connections = 0
+        self._heartbeat_task: asyncio.Task | None = None
+        # every change to a room's state runs on that room's actor
+        self.actors = RoomActorRegistry()
+        # set on shutdown: existing rooms keep working, new rooms are refused
+        self.draining = False
+        # room state from the previous process, restored on first access to the room
+        self.pending_restore: Dict[str, Dict] = {}
+        # game deadlines, at most one armed per room
+        self.timers = TimerWheel()
+        self.deadlines: Dict[str, Timer] = {}
+        # watchers, fed coalesced GAME_STATE snapshots instead of every frame
+        self.spectators = SpectatorTier(self.game_state_message)
     
     def set_game_state(self, room_id: str, state: Dict):
         """Set the current game state for a room."""
         self.game_states[room_id] = state
-        log.info(f"Game state updated for room_id: {room_id}")
+        if sampled("state"):
+            log.info("Game state updated for room_id: %s", room_id, extra=log_context(room_id, category="state"))
 
     def get_game_state(self, room_id: str) -> Dict:
         """Get the current game state for a room."""
@@ -30,37 +72,127 @@ class ConnectionManager:
         game_state['players'] = self.get_players(room_id)
         return game_state
 
+    def game_state_message(self, room_id: str) -> GameStateMessage:
+        """The full state of a room, as sent on REJOIN and to spectators."""
+        game_state = self.game_states.get(room_id, {})
+        return GameStateMessage(
+            type=MessageType.GAME_STATE,
+            gameStarted=game_state.get('gameStarted', False),
+            gameEnded=game_state.get('gameEnded', False),
+            gameId=game_state.get('gameId', ''),
+            players=self.get_players(room_id),
+            loser=game_state.get('loser', None),
+            winners=game_state.get('winners', []),
+            mealSubmitted=game_state.get('mealSubmitted', {}),
+            scores=game_state.get('scores', {}),
+        )
+
     async def connect(self, room_id: str, websocket: WebSocket, player: str):
         await websocket.accept()
-        self.add_player(room_id, websocket, player)
+        await self.actors.call(room_id, partial(self.add_player, room_id, websocket, player))
 
     def add_player(self, room_id: str, websocket: WebSocket, player: str):
+        # Before anything can create live state that would shadow the snapshot.
+        self.restore_room(room_id)
         if not any(conn.player == player for conn in self.active_connections[room_id]):
             player_connection = PlayerConnection(websocket, player)
             self.active_connections[room_id].append(player_connection)
-            log.info(f"Player {player} added to room_id: {room_id}")
+            log.info(
+                "Player %s added to room_id: %s", player, room_id,
+                extra=log_context(room_id, player, "connection"),
+            )
         else:
-            log.info(f"Player {player} is already in room_id: {room_id}, not adding again.")
+            log.info(
+                "Player %s is already in room_id: %s, not adding again.", player, room_id,
+                extra=log_context(room_id, player, "connection"),
+            )
     
     def disconnect(self, room_id: str, websocket: WebSocket):
         connections = self.active_connections.get(room_id, [])
         for conn in connections:
             if conn.websocket == websocket:
                 connections.remove(conn)
-                log.info(f"WebSocket disconnected for player {conn.player} from room_id: {room_id}")
+                log.info(
+                    "WebSocket disconnected for player %s from room_id: %s", conn.player, room_id,
+                    extra=log_context(room_id, conn.player, "connection"),
+                )
                 break
         if not connections and room_id in self.active_connections:
             del self.active_connections[room_id]
-            log.info(f"No active connections left in room_id: {room_id}")
+            log.info(
+                "No active connections left in room_id: %s", room_id,
+                extra=log_context(room_id, category="connection"),
+            )
+
+    def touch(self, room_id: str, websocket: WebSocket):
+        """Record activity on a connection so it is not reaped as idle."""
+        for conn in self.active_connections.get(room_id, []):
+            if conn.websocket == websocket:
+                conn.last_seen = time.monotonic()
+                return
+
+    async def drop_connection(self, room_id: str, websocket: WebSocket) -> str | None:
+        """Remove a connection and notify the rest of the room that the player left."""
+        disconnected_player = self.get_player_from_websocket(room_id, websocket)
+        if disconnected_player is None:
+            return None
+        self.disconnect(room_id, websocket)
+
+        notification = UserDisjoinedNotification(player=disconnected_player)
+        await self.broadcast(room_id, notification)
+
+        player_list_message = PlayerListMessage(
+            type=MessageType.PLAYER_LIST,
+            players=self.get_players(room_id)
+        )
+        if self.get_connections(room_id):
+            await self.broadcast(room_id, player_list_message)
+        log.info(
+            "Player disconnected: %s. Updated player list: %s", disconnected_player, player_list_message.players,
+            extra=log_context(room_id, disconnected_player, "connection"),
+        )
+        return disconnected_player
+
+    async def reap(self, room_id: str, websocket: WebSocket, reason: str):
+        """Evict a dead or idle connection as if it had disconnected cleanly."""
+        if self.get_player_from_websocket(room_id, websocket) is None:
+            return
+        self.reaped_connections += 1
+        log.warning(
+            "Reaping connection in room_id %s: %s", room_id, reason,
+            extra=log_context(room_id, category="connection"),
+        )
+        try:
+            await asyncio.wait_for(websocket.close(code=status.WS_1001_GOING_AWAY), WS_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+        await self.drop_connection(room_id, websocket)
 
     async def broadcast(self, room_id: str, message: BaseModel):
         connections = self.active_connections.get(room_id, [])
-        log.info(f"Broadcasting message to connections in room_id: {room_id}")
-        for connection in connections:
-            try:
-                await connection.websocket.send_json(message.model_dump())
-            except Exception as e:
-                log.error(f"Failed to send message to player {connection.player} in room_id {room_id}: {e}")
+        message_type = getattr(message, 'type', None)
+        if sampled("broadcast"):
+            log.info(
+                "Broadcasting %s to connections in room_id: %s", message_type, room_id,
+                extra=log_context(room_id, category="broadcast", message_type=message_type),
+            )
+        dead = []
+        # Serialize once for the whole room instead of once per connection.
+        payload = message.model_dump_json()
+        with span("ws.broadcast", room_id=room_id, type=message_type, recipients=len(connections)):
+            for connection in list(connections):
+                try:
+                    await asyncio.wait_for(connection.websocket.send_text(payload), WS_SEND_TIMEOUT_SECONDS)
+                except Exception as e:
+                    log.error(
+                        "Failed to send message to player %s in room_id %s: %s", connection.player, room_id,
+                        str(e) or type(e).__name__,
+                        extra=log_context(room_id, connection.player, "broadcast"),
+                    )
+                    dead.append(connection.websocket)
+        for websocket in dead:
+            await self.reap(room_id, websocket, "send failed")
+        self.spectators.mark_dirty(room_id)
 
     def get_connections(self, room_id: str) -> List[PlayerConnection]:
         """Return the list of active PlayerConnection objects for a given room_id."""
@@ -72,11 +204,17 @@ class ConnectionManager:
         for conn in connections:
             if conn.player == player:
                 connections.remove(conn)
-                log.info(f"Player {player} removed from room_id: {room_id}")
+                log.info(
+                    "Player %s removed from room_id: %s", player, room_id,
+                    extra=log_context(room_id, player, "connection"),
+                )
                 break
         if not connections:
             del self.active_connections[room_id]
-            log.info(f"No active connections left in room_id: {room_id}")
+            log.info(
+                "No active connections left in room_id: %s", room_id,
+                extra=log_context(room_id, category="connection"),
+            )
 
     def get_players(self, room_id: str) -> List[str]:
         """Get the list of players currently connected in a room."""
@@ -84,12 +222,22 @@ class ConnectionManager:
 
     async def broadcast_to_others(self, room_id: str, message: BaseModel, exclude: WebSocket):
         connections = self.active_connections.get(room_id, [])
-        for connection in connections:
+        dead = []
+        payload = message.model_dump_json()
+        for connection in list(connections):
             if connection.websocket != exclude:
                 try:
-                    await connection.websocket.send_json(message.model_dump())
+                    await asyncio.wait_for(connection.websocket.send_text(payload), WS_SEND_TIMEOUT_SECONDS)
                 except Exception as e:
-                    log.error(f"Failed to send message to player {connection.player} in room_id {room_id}: {e}")
+                    log.error(
+                        "Failed to send message to player %s in room_id %s: %s", connection.player, room_id,
+                        str(e) or type(e).__name__,
+                        extra=log_context(room_id, connection.player, "broadcast"),
+                    )
+                    dead.append(connection.websocket)
+        for websocket in dead:
+            await self.reap(room_id, websocket, "send failed")
+        self.spectators.mark_dirty(room_id)
 
     def get_player_from_websocket(self, room_id: str, websocket: WebSocket) -> str | None:
         """Retrieve the player associated with a given WebSocket in a specific room."""
@@ -103,7 +251,10 @@ class ConnectionManager:
     def mark_meal_submitted(self, room_id: str, player: str):
         """Mark a player's meal as submitted."""
         self.meal_submissions[room_id].add(player)
-        log.info(f"Player {player} has submitted their meal in room_id: {room_id}")
+        log.info(
+            "Player %s has submitted their meal in room_id: %s", player, room_id,
+            extra=log_context(room_id, player, "state"),
+        )
 
     def all_meals_submitted(self, room_id: str) -> bool:
         """Check if all players have submitted their meals."""
@@ -114,10 +265,155 @@ class ConnectionManager:
     def reset_meal_submissions(self, room_id: str):
         """Reset meal submissions for a room."""
         self.meal_submissions[room_id] = set()
-        log.info(f"Meal submissions reset for room_id: {room_id}")
+        if sampled("state"):
+            log.info(
+                "Meal submissions reset for room_id: %s", room_id,
+                extra=log_context(room_id, category="state"),
+            )
 
     def reset_game_state(self, room_id: str):
         """Reset the game state for a room."""
         if room_id in self.game_states:
             del self.game_states[room_id]
-            log.info(f"Game state reset for room_id: {room_id}")
+            if sampled("state"):
+                log.info(
+                    "Game state reset for room_id: %s", room_id,
+                    extra=log_context(room_id, category="state"),
+                )
+
+    def set_deadline(self, room_id: str, delay: float, job: Job):
+        """Post `job` to the room's actor after `delay` seconds, replacing the room's deadline."""
+        self.cancel_deadline(room_id)
+        self.deadlines[room_id] = self.timers.schedule(delay, self._deadline_reached, room_id, job)
+
+    def cancel_deadline(self, room_id: str):
+        timer = self.deadlines.pop(room_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _deadline_reached(self, room_id: str, job: Job):
+        self.deadlines.pop(room_id, None)
+        return self.actors.post(room_id, job)
+
+    def start_heartbeat(
+        self,
+        interval: float = WS_HEARTBEAT_INTERVAL_SECONDS,
+        idle_timeout: float = WS_IDLE_TIMEOUT_SECONDS,
+    ):
+        """Start pinging all connections and reaping idle ones in the background."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(interval, idle_timeout))
+
+    async def stop_heartbeat(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    async def _heartbeat(self, interval: float, idle_timeout: float):
+        ping = PingMessage().model_dump()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            # Pings go out concurrently, so a peer that stopped reading only
+            # delays the round by the send timeout, not by its own stall.
+            checks = []
+            for room_id, connections in list(self.active_connections.items()):
+                for conn in list(connections):
+                    if now - conn.last_seen > idle_timeout:
+                        reason = f"idle for {now - conn.last_seen:.0f}s"
+                        checks.append(self.actors.post(room_id, partial(self.reap, room_id, conn.websocket, reason)))
+                    else:
+                        checks.append(self._ping(room_id, conn, ping))
+            for room_id, spectator in self.spectators.connections():
+                if now - spectator.last_seen > idle_timeout:
+                    checks.append(self.spectators.drop(room_id, spectator.websocket))
+                else:
+                    checks.append(self._ping_spectator(room_id, spectator.websocket, ping))
+            for result in await asyncio.gather(*checks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    log.error("Heartbeat failed: %s", result)
+
+    async def _ping(self, room_id: str, conn: PlayerConnection, ping: Dict):
+        try:
+            await asyncio.wait_for(conn.websocket.send_json(ping), WS_SEND_TIMEOUT_SECONDS)
+        except Exception as e:
+            reason = f"ping failed: {str(e) or type(e).__name__}"
+            await self.actors.post(room_id, partial(self.reap, room_id, conn.websocket, reason))
+
+    async def _ping_spectator(self, room_id: str, websocket: WebSocket, ping: Dict):
+        try:
+            await asyncio.wait_for(websocket.send_json(ping), WS_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            await self.spectators.drop(room_id, websocket)
+
+    def snapshot_rooms(self) -> Dict[str, Dict]:
+        """Serializable copy of all in-memory room state."""
+        room_ids = set(self.game_states) | set(self.meal_submissions) | set(self.scores)
+        return {
+            room_id: {
+                "game_state": {k: v for k, v in self.game_states.get(room_id, {}).items() if k != 'players'},
+                "meal_submissions": sorted(self.meal_submissions.get(room_id, set())),
+                "scores": self.scores.get(room_id, {}),
+            }
+            for room_id in room_ids
+        }
+
+    def load_snapshot(self, path: Path):
+        """Load a snapshot written by `drain`; rooms are restored on first access."""
+        self.pending_restore = load_snapshot(path)
+
+    def restore_room(self, room_id: str) -> bool:
+        """Restore a room from the snapshot unless it already has live state."""
+        snapshot = self.pending_restore.pop(room_id, None)
+        if snapshot is None or room_id in self.game_states:
+            return False
+        if snapshot["game_state"]:
+            self.game_states[room_id] = snapshot["game_state"]
+        if snapshot["meal_submissions"]:
+            self.meal_submissions[room_id] = set(snapshot["meal_submissions"])
+        if snapshot["scores"]:
+            self.scores[room_id] = snapshot["scores"]
+        log.info("Restored room_id %s from snapshot", room_id, extra=log_context(room_id, category="state"))
+        return True
+
+    async def drain(self, path: Path, timeout: float = DRAIN_TIMEOUT_SECONDS):
+        """Stop taking new rooms, persist live room state and ask clients to reconnect.
+
+        Runs once; later calls return immediately.
+        """
+        if self.draining:
+            return
+        self.draining = True
+        try:
+            await asyncio.wait_for(self.actors.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Timed out waiting for room actors to finish, snapshotting anyway")
+
+        rooms = self.snapshot_rooms()
+        # Rooms that were never rejoined are carried over to the next process.
+        for room_id, snapshot in self.pending_restore.items():
+            rooms.setdefault(room_id, snapshot)
+        write_snapshot(path, rooms)
+
+        notification = ReconnectNotification(
+            message="Server is restarting, please reconnect.",
+            retry_after_ms=RECONNECT_AFTER_MS,
+        ).model_dump()
+
+        async def reconnect(websocket: WebSocket):
+            try:
+                await asyncio.wait_for(websocket.send_json(notification), WS_SEND_TIMEOUT_SECONDS)
+                await asyncio.wait_for(websocket.close(code=status.WS_1012_SERVICE_RESTART), WS_SEND_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+
+        websockets = [conn.websocket for connections in self.active_connections.values() for conn in connections]
+        spectators = list(self.spectators.connections())
+        for room_id, spectator in spectators:
+            self.spectators.remove(room_id, spectator.websocket)
+        websockets.extend(spectator.websocket for _, spectator in spectators)
+        await asyncio.gather(*(reconnect(websocket) for websocket in websockets))
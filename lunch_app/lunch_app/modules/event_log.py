@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+from sqlalchemy import insert, select
+
+from lunch_app.database import get_session_context
+from lunch_app.modules.models.model import GameEvent
+from lunch_app.modules.types.constants import (
+    EVENT_LOG_BACKEND,
+    EVENT_LOG_BACKUP_COUNT,
+    EVENT_LOG_BATCH_SIZE,
+    EVENT_LOG_FLUSH_SECONDS,
+    EVENT_LOG_MAX_BUFFER,
+    EVENT_LOG_MAX_BYTES,
+    EVENT_LOG_PATH,
+)
+
+log = logging.getLogger(__name__)
+
+# Event kinds. Messages carry the raw client payload, connect/disconnect let a
+# replay rebuild the set of players in a room.
+CONNECT = "connect"
+MESSAGE = "message"
+DISCONNECT = "disconnect"
+
+class EventLogBackend(ABC):
+    @abstractmethod
+    async def write_batch(self, events: List[Dict]) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+class FileEventLogBackend(EventLogBackend):
+    """Appends events as JSON lines to a file, rotated once it reaches `max_bytes`.
+
+    Rotation happens between batches, so a file can exceed `max_bytes` by one
+    batch. The oldest of `backup_count` rotated files is deleted.
+    """
+    def __init__(self, path: Path, max_bytes: int = EVENT_LOG_MAX_BYTES, backup_count: int = EVENT_LOG_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file: Optional[TextIO] = None
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def _write(self, lines: str):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(lines)
+        self._file.flush()
+        if self.max_bytes > 0 and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    async def write_batch(self, events: List[Dict]) -> None:
+        lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events)
+        await asyncio.to_thread(self._write, lines)
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class DbEventLogBackend(EventLogBackend):
+    """Inserts events into the `game_events` table, one statement per batch."""
+    async def write_batch(self, events: List[Dict]) -> None:
+        async with get_session_context() as session:
+            await session.execute(insert(GameEvent), events)
+            await session.commit()
+
+def read_file_events(path: Path) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+async def read_db_events(room_id: Optional[str] = None) -> List[Dict]:
+    async with get_session_context() as session:
+        query = select(
+            GameEvent.seq, GameEvent.ts, GameEvent.kind, GameEvent.room_id, GameEvent.player, GameEvent.data
+        ).order_by(GameEvent.id)
+        if room_id:
+            query = query.where(GameEvent.room_id == room_id)
+        result = await session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+class EventLog:
+    """Buffered, batched, append-only log of WebSocket events.
+
+    `record` only appends to an in-memory buffer; a background task writes
+    batches to the backend, so the handlers never wait on disk or DB I/O. When
+    the buffer is full new events are dropped and counted rather than blocking
+    the game.
+    """
+    def __init__(
+        self,
+        backend: EventLogBackend | None,
+        batch_size: int = EVENT_LOG_BATCH_SIZE,
+        flush_interval: float = EVENT_LOG_FLUSH_SECONDS,
+        max_buffer: int = EVENT_LOG_MAX_BUFFER,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.buffer: deque = deque()
+        self.seq = 0
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def record(self, kind: str, room_id: str, player: str | None, data: Dict | None = None):
+        if self.backend is None:
+            return
+        if len(self.buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self.seq += 1
+        self.buffer.append({
+            "seq": self.seq,
+            "ts": time.time(),
+            "kind": kind,
+            "room_id": room_id,
+            "player": player,
+            "data": data,
+        })
+        if len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        if self.backend is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Let the writer finish its current batch instead of cancelling it.
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        if self.backend is not None:
+            await self.backend.close()
+
+    async def flush(self):
+        while self.buffer:
+            batch = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+            try:
+                await self.backend.write_batch(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                log.error("Failed to write %s events: %s", len(batch), e)
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+def create_event_log(backend: str = EVENT_LOG_BACKEND) -> EventLog:
+    if backend == "file":
+        return EventLog(FileEventLogBackend(Path(EVENT_LOG_PATH)))
+    if backend == "db":
+        return EventLog(DbEventLogBackend())
+    if backend == "none":
+        return EventLog(None)
+    raise ValueError(f"Unknown event log backend: {backend}")
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from lunch_app.modules.types.constants import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS
+
+class IdempotencyCache:
+    """Results of mutating messages by (room_id, idempotency key).
+
+    Entries expire after `ttl` seconds and the oldest are evicted beyond
+    `size`. With one TTL for every entry, insertion order is expiry order,
+    so expired entries are always at the front and removed in O(1) each.
+    """
+    def __init__(self, size: int = IDEMPOTENCY_CACHE_SIZE, ttl: float = IDEMPOTENCY_TTL_SECONDS):
+        self.size = size
+        self.ttl = ttl
+        # (room_id, key) -> (expires at, serialized result)
+        self.entries: OrderedDict[Tuple[str, str], Tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _expire(self, now: float):
+        while self.entries:
+            key, (expires_at, _) = next(iter(self.entries.items()))
+            if expires_at > now:
+                return
+            del self.entries[key]
+
+    def get(self, room_id: str, key: str) -> Optional[str]:
+        self._expire(time.monotonic())
+        entry = self.entries.get((room_id, key))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, room_id: str, key: str, result: str):
+        if self.size <= 0:
+            return
+        now = time.monotonic()
+        self._expire(now)
+        self.entries[(room_id, key)] = (now + self.ttl, result)
+        self.entries.move_to_end((room_id, key))
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,115 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional, TextIO
+
+from lunch_app.modules.types.constants import LOG_FORMAT, LOG_LEVEL, LOG_SAMPLE_RATES
+
+# Extra fields copied into structured records when a log call provides them,
+# e.g. log.info("...", extra=log_context(room_id, category="broadcast")).
+CONTEXT_FIELDS = ("room_id", "player", "message_type", "category")
+
+def log_context(
+    room_id: Optional[str] = None,
+    player: Optional[str] = None,
+    category: Optional[str] = None,
+    message_type: Optional[str] = None,
+) -> Dict:
+    """Build the `extra` dict of a log call."""
+    return {"room_id": room_id, "player": player, "category": category, "message_type": message_type}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, carrying the context fields of the record."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock handler renders `msg % args` in the caller before enqueueing,
+    which puts the formatting cost back on the event loop.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_rates: Dict[str, float] = dict(LOG_SAMPLE_RATES)
+
+def sampled(category: str) -> bool:
+    """Whether to emit a record of a noisy category.
+
+    Checked before the log call so dropped records are never even created:
+    `if sampled("broadcast"): log.info(...)`.
+    """
+    rate = _sample_rates.get(category, 1.0)
+    return rate >= 1.0 or random.random() < rate
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample_rates: Optional[Dict[str, float]] = None,
+    stream: Optional[TextIO] = None,
+):
+    """Route all app logs through a queue to a background writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    if sample_rates is not None:
+        _sample_rates.clear()
+        _sample_rates.update(sample_rates)
+
+    app_logger = logging.getLogger("lunch_app")
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+    app_logger.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def configure(level: Optional[str] = None, sample_rates: Optional[Dict[str, float]] = None) -> Dict:
+    """Change the level and sampling rates of the running app."""
+    app_logger = logging.getLogger("lunch_app")
+    if level is not None:
+        app_logger.setLevel(level.upper())
+    if sample_rates is not None:
+        _sample_rates.update(sample_rates)
+    return get_config()
+
+def get_config() -> Dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger("lunch_app").getEffectiveLevel()),
+        "sample_rates": dict(_sample_rates),
+    }
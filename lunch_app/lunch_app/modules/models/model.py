@@ -1,8 +1,9 @@
 import uuid
-from sqlalchemy import BigInteger, Column, String, ForeignKey, Float, Boolean
+from sqlalchemy import JSON, BigInteger, Column, String, ForeignKey, Float, Boolean, Index, Integer, Sequence, text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
+from typing import List
 
 from lunch_app.database import Base
 
@@ -13,13 +14,19 @@ class Game(Base):
     created_at_utc = Column(BigInteger, default=lambda: datetime.now(timezone.utc).timestamp())
     ended_at_utc = Column(BigInteger, nullable=True)
     is_active = Column(Boolean, default=True) # if true, game is ongoing, if false game ended
-    players = Column(ARRAY(String), nullable=False)
-    winners = Column(ARRAY(String), nullable=True)
+    players: Column[List[str]] = Column(ARRAY(String), nullable=False)
+    winners: Column[List[str]] = Column(ARRAY(String), nullable=True)
     loser = Column(String, nullable=True)
     meals = relationship('Meal', back_populates='game')
     room_id = Column(String, ForeignKey('game_rooms.id'), nullable=False)
     room = relationship('GameRoom', back_populates='games')
 
+    __table_args__ = (
+        # Only active games are looked up by room, keep that index tiny.
+        Index('ix_games_room_id_active', 'room_id', postgresql_where=text('is_active')),
+        Index('ix_games_ended_at_utc', 'ended_at_utc'),
+    )
+
 class Meal(Base):
     """Represents a meal cost for each player in a game."""
     __tablename__='meals'
@@ -31,6 +38,13 @@ class Meal(Base):
 
     game = relationship('Game', back_populates='meals')
 
+    __table_args__ = (
+        Index('ix_meals_game_id', 'game_id'),
+    )
+
+# Numbers the generated room codes, see modules/room_codes.py.
+room_code_sequence = Sequence('game_room_code_seq', metadata=Base.metadata)
+
 class GameRoom(Base):
     """Represents a virtual space where users can play games together."""
     __tablename__='game_rooms'
@@ -39,5 +53,46 @@ class GameRoom(Base):
     code = Column(String, nullable=False)
     created_at_utc = Column(BigInteger, default=lambda: datetime.now(timezone.utc).timestamp())
     is_active = Column(Boolean, default=False) # if true, game is ongoing
+    spin_timeout_seconds = Column(Integer, nullable=True) # null: SPIN_TIMEOUT_SECONDS
+    meal_timeout_seconds = Column(Integer, nullable=True) # null: MEAL_TIMEOUT_SECONDS
     games = relationship('Game', back_populates='room')
-    
\ No newline at end of file
+
+    __table_args__ = (
+        # Rooms are joined by code, which therefore has to be unique.
+        Index('ix_game_rooms_code', 'code', unique=True),
+    )
+
+class ArchivedGame(Base):
+    """Finished game moved out of the hot `games` table by the archiver."""
+    __tablename__='games_archive'
+    id = Column(String, primary_key=True)
+    created_at_utc = Column(BigInteger)
+    ended_at_utc = Column(BigInteger, nullable=True, index=True)
+    is_active = Column(Boolean, default=False)
+    players: Column[List[str]] = Column(ARRAY(String), nullable=False)
+    winners: Column[List[str]] = Column(ARRAY(String), nullable=True)
+    loser = Column(String, nullable=True)
+    meals = relationship('ArchivedMeal', back_populates='game')
+    room_id = Column(String, ForeignKey('game_rooms.id'), nullable=False)
+
+class ArchivedMeal(Base):
+    """Meal of an archived game."""
+    __tablename__='meals_archive'
+    id = Column(String, primary_key=True)
+    player = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+    currency = Column(String, nullable=False)
+    game_id = Column(String, ForeignKey('games_archive.id'), nullable=False, index=True)
+
+    game = relationship('ArchivedGame', back_populates='meals')
+
+class GameEvent(Base):
+    """Append-only record of a WebSocket event, written by the event log."""
+    __tablename__='game_events'
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    seq = Column(BigInteger, nullable=False)
+    ts = Column(Float, nullable=False)
+    kind = Column(String, nullable=False)
+    room_id = Column(String, nullable=False, index=True)
+    player = Column(String, nullable=True)
+    data = Column(JSON, nullable=True)
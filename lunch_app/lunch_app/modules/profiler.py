@@ -0,0 +1,31 @@
+import sys
+import time
+from collections import Counter
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+def sample_stacks(thread_id: int, seconds: float, interval: float) -> Counter:
+    """Sample the stack of `thread_id` every `interval` seconds for `seconds`.
+
+    Meant to run in a helper thread while the sampled thread (usually the
+    event loop) keeps serving requests.
+    """
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            break
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        stacks[';'.join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+def to_folded(stacks: Counter) -> str:
+    """Render samples in the folded format read by flamegraph.pl and speedscope."""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
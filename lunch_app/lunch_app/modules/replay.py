@@ -0,0 +1,100 @@
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple, cast
+from fastapi import WebSocket
+
+from lunch_app.modules import event_log as events
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.idempotency import IdempotencyCache
+from lunch_app.modules.schemas.schema import GameRoomBase
+from lunch_app.modules.storage.memory import MemoryStorage
+from lunch_app.modules.storage.provider import get_storage, set_storage
+from lunch_app.modules.types.enums import MessageType
+from lunch_app.router import ws
+
+log = logging.getLogger(__name__)
+
+class ReplayWebSocket:
+    """Stands in for a client socket; counts the frames the server sends."""
+    def __init__(self, room_id: str, player: str):
+        self.room_id = room_id
+        self.player = player
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.frames += 1
+
+    async def send_text(self, data):
+        self.frames += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+@dataclass
+class ReplayStats:
+    events: int = 0
+    messages: int = 0
+    frames: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+async def replay(recorded: Iterable[Dict], with_db: bool = False, seed: int = 0) -> ReplayStats:
+    """Feed recorded events through MESSAGE_HANDLERS against fake sockets.
+
+    Events are processed one after another as fast as possible on a fresh
+    ConnectionManager and idempotency cache, with the random generator seeded so SPIN scores and
+    loser draws are the same on every run. Games are stored in a fresh
+    MemoryStorage unless `with_db` is set, then the configured storage is used.
+    """
+    random.seed(seed)
+    live_manager = ws.manager
+    ws.manager = ConnectionManager()
+    # Retried commands are deduplicated as in the recording, without leaking
+    # results into or out of the live cache.
+    live_idempotency = ws.idempotency
+    ws.idempotency = IdempotencyCache()
+    live_storage = None if with_db else set_storage(MemoryStorage())
+    sockets: Dict[Tuple[str, str], ReplayWebSocket] = {}
+    websocket: Optional[ReplayWebSocket]
+    stats = ReplayStats()
+    start = time.perf_counter()
+    try:
+        for event in recorded:
+            stats.events += 1
+            room_id, player, kind = event["room_id"], event["player"], event["kind"]
+
+            if kind == events.CONNECT:
+                if not with_db and await get_storage().get_room(room_id) is None:
+                    # Recorded rooms were created over HTTP, which is not replayed.
+                    await get_storage().create_room(GameRoomBase(name=room_id), id=room_id)
+                websocket = ReplayWebSocket(room_id, player)
+                sockets[(room_id, player)] = websocket
+                ws.manager.add_player(room_id, cast(WebSocket, websocket), player)
+            elif kind == events.DISCONNECT:
+                websocket = sockets.pop((room_id, player), None)
+                if websocket:
+                    stats.frames += websocket.frames
+                    await ws.manager.drop_connection(room_id, cast(WebSocket, websocket))
+            elif kind == events.MESSAGE:
+                message_enum = MessageType(event["data"]["type"])
+                websocket = sockets.get((room_id, player))
+                if websocket is None:
+                    websocket = sockets[(room_id, player)] = ReplayWebSocket(room_id, player)
+                await ws.dispatch_message(room_id, message_enum, event["data"], cast(WebSocket, websocket))
+                stats.messages += 1
+    finally:
+        stats.elapsed = time.perf_counter() - start
+        stats.frames += sum(websocket.frames for websocket in sockets.values())
+        ws.manager = live_manager
+        ws.idempotency = live_idempotency
+        if not with_db:
+            set_storage(live_storage)
+    return stats
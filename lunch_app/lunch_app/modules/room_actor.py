@@ -0,0 +1,104 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from lunch_app.modules.log_config import log_context
+from lunch_app.modules.types.constants import ROOM_ACTOR_IDLE_SECONDS, ROOM_ACTOR_INBOX_SIZE
+
+log = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any] | Any]
+
+class RoomActor:
+    """Single consumer of a room's inbox.
+
+    Every mutation of a room's state is posted here as a job and executed one
+    at a time, in order, so handlers can await DB calls and broadcasts without
+    another message for the same room interleaving with them.
+    """
+    def __init__(self, room_id: str, registry: 'RoomActorRegistry', inbox_size: int, idle_timeout: float):
+        self.room_id = room_id
+        self.registry = registry
+        self.idle_timeout = idle_timeout
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=inbox_size)
+        self.task = asyncio.create_task(self._run(), name=f"room-actor-{room_id}")
+
+    async def post(self, job: Job):
+        # Blocks the producer when the inbox is full, which applies
+        # backpressure to the socket that floods the room.
+        await self.inbox.put(job)
+
+    async def _run(self):
+        while True:
+            try:
+                job = await asyncio.wait_for(self.inbox.get(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                # Nothing is awaited between the check and the removal, so no
+                # job can be posted to a retired actor.
+                if self.inbox.empty():
+                    self.registry._retire(self)
+                    return
+                continue
+
+            try:
+                result = job()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log.error("Job failed in room_id %s: %s", self.room_id, e, extra=log_context(self.room_id))
+            finally:
+                self.inbox.task_done()
+
+class RoomActorRegistry:
+    """Creates room actors on demand and retires them once they go idle."""
+    def __init__(self, inbox_size: int = ROOM_ACTOR_INBOX_SIZE, idle_timeout: float = ROOM_ACTOR_IDLE_SECONDS):
+        self.inbox_size = inbox_size
+        self.idle_timeout = idle_timeout
+        self.actors: Dict[str, RoomActor] = {}
+
+    def get(self, room_id: str) -> RoomActor:
+        actor = self.actors.get(room_id)
+        if actor is None:
+            actor = RoomActor(room_id, self, self.inbox_size, self.idle_timeout)
+            self.actors[room_id] = actor
+        return actor
+
+    async def post(self, room_id: str, job: Job):
+        """Queue a job on the room's actor without waiting for it to run."""
+        await self.get(room_id).post(job)
+
+    async def call(self, room_id: str, job: Job) -> Any:
+        """Queue a job on the room's actor and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+
+        async def run():
+            try:
+                result = job()
+                if inspect.isawaitable(result):
+                    result = await result
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+
+        await self.post(room_id, run)
+        return await future
+
+    def queue_depth(self) -> int:
+        """Total number of jobs waiting in all room inboxes."""
+        return sum(actor.inbox.qsize() for actor in self.actors.values())
+
+    async def join(self):
+        """Wait until every queued job has been processed."""
+        for actor in list(self.actors.values()):
+            await actor.inbox.join()
+
+    async def stop(self):
+        for actor in list(self.actors.values()):
+            actor.task.cancel()
+        await asyncio.gather(*(actor.task for actor in self.actors.values()), return_exceptions=True)
+        self.actors.clear()
+
+    def _retire(self, actor: RoomActor):
+        if self.actors.get(actor.room_id) is actor:
+            del self.actors[actor.room_id]
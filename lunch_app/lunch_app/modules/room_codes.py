@@ -0,0 +1,113 @@
+"""Short room codes and the code -> room cache.
+
+Generated codes are a sequence number run through a keyed Feistel network
+over 40 bits and written as 8 Crockford base32 characters. The network is a
+permutation, so distinct sequence numbers always give distinct codes and no
+generated code has to be checked against the database. Custom codes of the
+same shape are refused, which keeps the two namespaces apart. The key only
+makes codes hard to guess in order; it is not a secret worth protecting.
+
+Codes are case-insensitive, and in generated codes I and L read as 1 and O as
+0, as in Crockford base32; `normalize_room_code` applies both rules.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, TypeVar
+
+from lunch_app.modules.types.constants import ROOM_CODE_CACHE_SIZE, ROOM_CODE_SECRET
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CODE_LENGTH = 8
+# Characters left out of ALPHABET because they are easily misread.
+_MISREAD = str.maketrans("ILO", "110")
+_HALF_BITS = CODE_LENGTH * 5 // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+_KEY = hashlib.blake2b(ROOM_CODE_SECRET.encode(), digest_size=32).digest()
+
+def _round(value: int, round_index: int, key: bytes) -> int:
+    digest = hashlib.blake2b(
+        value.to_bytes(4, 'big'), digest_size=4, key=key, person=round_index.to_bytes(2, 'big')
+    ).digest()
+    return int.from_bytes(digest, 'big') & _HALF_MASK
+
+def permute(number: int, key: bytes = _KEY) -> int:
+    """Bijection of [0, 2**40): the same number always maps to the same result."""
+    if not 0 <= number < 1 << (2 * _HALF_BITS):
+        raise ValueError("Room code sequence exhausted.")
+    left, right = number >> _HALF_BITS, number & _HALF_MASK
+    for round_index in range(_ROUNDS):
+        left, right = right, left ^ _round(right, round_index, key)
+    return left << _HALF_BITS | right
+
+def unpermute(value: int, key: bytes = _KEY) -> int:
+    """Inverse of `permute`."""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_index in reversed(range(_ROUNDS)):
+        left, right = right ^ _round(left, round_index, key), left
+    return left << _HALF_BITS | right
+
+def encode_room_code(number: int) -> str:
+    """Room code for the `number`-th generated room."""
+    value = permute(number)
+    return "".join(ALPHABET[(value >> shift) & 31] for shift in range(5 * (CODE_LENGTH - 1), -1, -5))
+
+def decode_room_code(code: str) -> int:
+    """Sequence number a generated code was made from."""
+    value = 0
+    for char in code:
+        value = value << 5 | ALPHABET.index(char)
+    return unpermute(value)
+
+def is_generated_shape(code: str) -> bool:
+    return len(code) == CODE_LENGTH and all(char in ALPHABET for char in code)
+
+def normalize_room_code(code: str) -> str:
+    """Canonical form of a typed code, used to store and to look up codes.
+
+    Misread characters are only mapped when that gives a generated code, so a
+    custom code like "LUNCH" is just upper-cased.
+    """
+    code = code.strip().upper()
+    mapped = code.translate(_MISREAD)
+    return mapped if is_generated_shape(mapped) else code
+
+V = TypeVar('V')
+
+class RoomCodeCache(Generic[V]):
+    """LRU of code -> resolved room. Codes never change, so entries never go stale."""
+    def __init__(self, size: int = ROOM_CODE_CACHE_SIZE):
+        self.size = size
+        self.entries: OrderedDict[str, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code: str) -> Optional[V]:
+        value = self.entries.get(code)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(code)
+        self.hits += 1
+        return value
+
+    def put(self, code: str, value: V):
+        if self.size <= 0:
+            return
+        self.entries[code] = value
+        self.entries.move_to_end(code)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every entry, for when rooms were replaced behind the app's back."""
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
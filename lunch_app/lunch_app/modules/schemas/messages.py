@@ -1,14 +1,19 @@
 from typing import Dict, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from lunch_app.modules.schemas.schema import MealPrice
 from lunch_app.modules.types.enums import MessageType
 
-class JoinMessage(BaseModel):
+class MessageBase(BaseModel):
+    # Validators and serializers are built by prewarm_messages() during
+    # startup instead of at import time.
+    model_config = ConfigDict(defer_build=True)
+
+class JoinMessage(MessageBase):
     type: MessageType = MessageType.JOIN
     player: str
     
-class GameStateMessage(BaseModel):
+class GameStateMessage(MessageBase):
     type: MessageType = MessageType.GAME_STATE
     gameStarted: bool
     gameEnded: bool 
@@ -20,52 +25,65 @@ class GameStateMessage(BaseModel):
     scores: Dict[str, int]
 
 # Outgoing Messages
-class PlayerJoinedNotification(BaseModel):
+class PlayerJoinedNotification(MessageBase):
     type: MessageType = MessageType.PLAYER_JOINED
     player: str
 
-class GameStartedNotification(BaseModel):
+class GameStartedNotification(MessageBase):
     type: MessageType = MessageType.GAME_STARTED
     message: str
     game_id: str
 
-class MealSubmittedNotification(BaseModel):
+class MealSubmittedNotification(MessageBase):
     type: MessageType = MessageType.MEAL_SUBMITTED
     message: str
     player: str
     meal: MealPrice
 
-class AllMealsSubmittedNotification(BaseModel):
+class AllMealsSubmittedNotification(MessageBase):
     type: MessageType = MessageType.ALL_MEALS_SUBMITTED
     message: str
 
-class GameEndedNotification(BaseModel):
+class GameEndedNotification(MessageBase):
     type: MessageType = MessageType.GAME_ENDED
     message: str
     loser: str
     winners: List[str]
 
-class ErrorNotification(BaseModel):
+class ErrorNotification(MessageBase):
     type: MessageType = MessageType.ERROR
     message: str
 
-class PlayerListMessage(BaseModel):
+class PlayerListMessage(MessageBase):
     type: MessageType = MessageType.PLAYER_LIST
     players: List[str]
 
-class PlayerJoinedMessage(BaseModel):
+class PlayerJoinedMessage(MessageBase):
     type: MessageType = MessageType.PLAYER_JOINED
     player: str
 
-class SpinNotification(BaseModel):
+class SpinNotification(MessageBase):
     type: MessageType = MessageType.SPINED
     player: str
     score: int
 
-class UserDisjoinedNotification(BaseModel):
+class UserDisjoinedNotification(MessageBase):
     type: MessageType = MessageType.USER_DISJOINED
     player: str
 
-class GameResetNotification(BaseModel):
+class GameResetNotification(MessageBase):
     type: MessageType = MessageType.GAME_RESET
-    message: str
\ No newline at end of file
+    message: str
+
+class PingMessage(MessageBase):
+    type: MessageType = MessageType.PING
+
+class ReconnectNotification(MessageBase):
+    type: MessageType = MessageType.RECONNECT
+    message: str
+    retry_after_ms: int
+
+def prewarm_messages():
+    """Build the deferred validators and serializers of all message models."""
+    for message_class in MessageBase.__subclasses__():
+        message_class.model_rebuild()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -10,10 +10,15 @@ class GameRoomActivityModel(BaseModel):
 
 class GameRoomBase(BaseModel):
     name: str
-    code: str
+    # None: a short code is generated
+    code: Optional[str] = None
+    # Per-room game deadlines in seconds, None uses the server default, 0 disables.
+    spin_timeout_seconds: Optional[int] = Field(default=None, ge=0)
+    meal_timeout_seconds: Optional[int] = Field(default=None, ge=0)
 
 class GameRoomModel(GameRoomBase):
     id: str
+    code: str
     created_at_utc: datetime
     is_active: bool
 
@@ -26,6 +31,12 @@ class GameRoomModel(GameRoomBase):
     def to_orm(self) -> GameRoom:
         return self.get_orm_model()(**self.model_dump())
 
+class GameRoomCodeModel(BaseModel):
+    """What a room code resolves to; none of it changes after creation."""
+    id: str
+    name: str
+    code: str
+
 # Meal
 class MealPrice(BaseModel):
     amount: float
@@ -56,7 +67,7 @@ class GameModel(GameBase):
     is_active: bool
     winners: Optional[List[str]]
     loser: Optional[str]
-    meals: Optional[List['MealModel']] = []
+    meals: Optional[List[MealModel]] = []
 
     model_config = ConfigDict(from_attributes=True)
     
@@ -71,5 +82,3 @@ class GameEndedModel(BaseModel):
     id: str
     winners: List[str]
     loser: str
-
-GameModel.model_rebuild()
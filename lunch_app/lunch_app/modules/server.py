@@ -0,0 +1,19 @@
+from typing import Awaitable, Callable
+
+import uvicorn
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that runs `drain` before it closes the open connections.
+
+    uvicorn closes every WebSocket with 1012 as the first step of its shutdown,
+    before the lifespan shutdown runs, so anything that still has to reach the
+    clients (RECONNECT, refusing new rooms) must happen here. The listening
+    sockets stay open meanwhile; admission refuses new rooms while draining.
+    """
+    def __init__(self, config: uvicorn.Config, drain: Callable[[], Awaitable[None]]):
+        super().__init__(config)
+        self.drain = drain
+
+    async def shutdown(self, sockets=None):
+        await self.drain()
+        await super().shutdown(sockets)
@@ -0,0 +1,47 @@
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+def write_snapshot(path: Path, rooms: Dict[str, Dict]) -> None:
+    """Atomically write the live room state as gzipped, compact JSON."""
+    payload = json.dumps(
+        {"version": SNAPSHOT_VERSION, "rooms": rooms},
+        separators=(",", ":"),
+        default=list,
+    ).encode()
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(payload)
+    # A crash while writing must not leave a truncated snapshot behind.
+    os.replace(tmp_path, path)
+    log.info("Wrote snapshot of %s rooms to %s", len(rooms), path)
+
+def load_snapshot(path: Path) -> Dict[str, Dict]:
+    """Read and remove a snapshot written by `write_snapshot`.
+
+    The file is removed so the same state is never restored twice.
+    """
+    if not path.exists():
+        return {}
+    try:
+        with gzip.open(path, "rb") as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError) as e:
+        log.error("Ignoring unreadable snapshot %s: %s", path, e)
+        return {}
+    finally:
+        path.unlink(missing_ok=True)
+
+    if data.get("version") != SNAPSHOT_VERSION:
+        log.error("Ignoring snapshot %s with unsupported version %s", path, data.get('version'))
+        return {}
+    rooms = data.get("rooms", {})
+    log.info("Loaded snapshot of %s rooms from %s", len(rooms), path)
+    return rooms
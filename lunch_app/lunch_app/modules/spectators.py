@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterator, Tuple
+from fastapi import WebSocket, status
+from pydantic import BaseModel
+
+from lunch_app.modules.log_config import log_context, sampled
+from lunch_app.modules.tracing import span
+from lunch_app.modules.types.constants import (
+    SPECTATOR_SEND_TIMEOUT_SECONDS,
+    SPECTATOR_SNAPSHOT_INTERVAL_SECONDS,
+)
+
+log = logging.getLogger(__name__)
+
+class SpectatorConnection:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.last_seen = time.monotonic()
+        # latest snapshot not yet sent; a newer one replaces it
+        self.pending: str | None = None
+        self.sender: asyncio.Task | None = None
+
+class SpectatorTier:
+    """Watchers of a room, fed coalesced state snapshots off the players' path.
+
+    Player broadcasts only mark the room dirty. Every `interval` the flusher
+    serializes one snapshot per dirty room and hands it to each spectator's
+    sender task, so a room gets at most one snapshot per interval however
+    many messages it sees, and a slow spectator holds only the newest one.
+    Snapshots are read between two actor jobs or in the middle of one; a
+    half-applied state is followed by another broadcast, which marks the
+    room dirty again.
+    """
+    def __init__(
+        self,
+        snapshot: Callable[[str], BaseModel],
+        interval: float = SPECTATOR_SNAPSHOT_INTERVAL_SECONDS,
+        send_timeout: float = SPECTATOR_SEND_TIMEOUT_SECONDS,
+    ):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.send_timeout = send_timeout
+        # room_id - websocket - spectator connection
+        self.rooms: Dict[str, Dict[WebSocket, SpectatorConnection]] = {}
+        # rooms changed since the last flush, in order
+        self.dirty: Dict[str, None] = {}
+        self.snapshots_sent = 0
+        # snapshots replaced by a newer one before they could be sent
+        self.snapshots_coalesced = 0
+        self.dropped = 0
+        self._task: asyncio.Task | None = None
+
+    def add(self, room_id: str, websocket: WebSocket):
+        self.rooms.setdefault(room_id, {})[websocket] = SpectatorConnection(websocket)
+        # The new spectator gets the current state with the next flush.
+        self.dirty[room_id] = None
+
+    def remove(self, room_id: str, websocket: WebSocket):
+        spectators = self.rooms.get(room_id)
+        if spectators is None:
+            return
+        spectator = spectators.pop(websocket, None)
+        if spectator is not None and spectator.sender is not None and spectator.sender is not asyncio.current_task():
+            spectator.sender.cancel()
+        if not spectators:
+            del self.rooms[room_id]
+            self.dirty.pop(room_id, None)
+
+    def touch(self, room_id: str, websocket: WebSocket):
+        spectator = self.rooms.get(room_id, {}).get(websocket)
+        if spectator is not None:
+            spectator.last_seen = time.monotonic()
+
+    def count(self, room_id: str | None = None) -> int:
+        if room_id is not None:
+            return len(self.rooms.get(room_id, ()))
+        return sum(len(spectators) for spectators in self.rooms.values())
+
+    def connections(self) -> Iterator[Tuple[str, SpectatorConnection]]:
+        for room_id, spectators in list(self.rooms.items()):
+            for spectator in list(spectators.values()):
+                yield room_id, spectator
+
+    def mark_dirty(self, room_id: str):
+        """Called on every player broadcast; O(1) so it stays off the critical path."""
+        if room_id in self.rooms:
+            self.dirty[room_id] = None
+
+    def flush(self):
+        """Send one snapshot to the spectators of every dirty room."""
+        dirty, self.dirty = self.dirty, {}
+        for room_id in dirty:
+            spectators = self.rooms.get(room_id)
+            if not spectators:
+                continue
+            with span("ws.spectators", room_id=room_id, recipients=len(spectators)):
+                payload = self.snapshot(room_id).model_dump_json()
+                for spectator in list(spectators.values()):
+                    if spectator.pending is not None:
+                        self.snapshots_coalesced += 1
+                    spectator.pending = payload
+                    if spectator.sender is None:
+                        spectator.sender = asyncio.create_task(self._send(room_id, spectator))
+
+    async def _send(self, room_id: str, spectator: SpectatorConnection):
+        try:
+            while spectator.pending is not None:
+                payload, spectator.pending = spectator.pending, None
+                await asyncio.wait_for(spectator.websocket.send_text(payload), self.send_timeout)
+                self.snapshots_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if sampled("broadcast"):
+                log.warning(
+                    "Dropping spectator in room_id %s: %s", room_id, str(e) or type(e).__name__,
+                    extra=log_context(room_id, category="broadcast"),
+                )
+            await self.drop(room_id, spectator.websocket)
+        finally:
+            spectator.sender = None
+
+    async def drop(self, room_id: str, websocket: WebSocket, code: int = status.WS_1001_GOING_AWAY):
+        """Evict a dead, slow or idle spectator."""
+        if websocket not in self.rooms.get(room_id, {}):
+            return
+        self.dropped += 1
+        self.remove(room_id, websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, spectator in self.connections():
+            if spectator.sender is not None:
+                spectator.sender.cancel()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                log.error("Spectator flush failed: %s", e)
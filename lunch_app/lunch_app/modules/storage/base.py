@@ -0,0 +1,99 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from pydantic import TypeAdapter
+
+from lunch_app.modules.schemas.schema import (
+    GameBase,
+    GameEndedModel,
+    GameModel,
+    GameRoomBase,
+    GameRoomModel,
+    MealModel,
+)
+
+game_list_adapter = TypeAdapter(List[GameModel])
+
+class StorageError(Exception):
+    """Base class of the errors a storage backend reports to its callers."""
+
+class NotFoundError(StorageError):
+    pass
+
+class ConflictError(StorageError):
+    """The request contradicts stored state, e.g. a second active game in a room."""
+
+class Storage(ABC):
+    """Repository for rooms, games and meals.
+
+    Backends take and return the pydantic schema models, so callers never see
+    sessions or ORM objects. Every backend has to pass `tests/test_storage.py`.
+    """
+
+    # Rooms
+
+    @abstractmethod
+    async def create_room(self, payload: GameRoomBase, id: Optional[str] = None) -> GameRoomModel:
+        """Create a room, with a generated id unless one is given.
+
+        Without a code in the payload one is generated from `room_codes`.
+        ConflictError if the code is taken or has the shape of a generated one.
+        """
+
+    @abstractmethod
+    async def get_room(self, id: str) -> Optional[GameRoomModel]:
+        ...
+
+    @abstractmethod
+    async def get_room_by_code(self, code: str) -> Optional[GameRoomModel]:
+        ...
+
+    @abstractmethod
+    async def list_rooms(self, is_active: bool) -> List[GameRoomModel]:
+        ...
+
+    @abstractmethod
+    async def set_room_active(self, id: str, is_active: bool) -> Optional[GameRoomModel]:
+        """Update the room's activity; None if there is no such room."""
+
+    @abstractmethod
+    async def get_room_timeouts(self, id: str) -> Tuple[Optional[int], Optional[int]]:
+        """Spin and meal timeouts configured for the room, None where unset."""
+
+    # Games
+
+    @abstractmethod
+    async def start_game(self, payload: GameBase) -> GameModel:
+        """Create an active game; ConflictError if the room already has one."""
+
+    @abstractmethod
+    async def end_game(self, payload: GameEndedModel) -> Optional[GameModel]:
+        """Record winners and loser. The game stays active until meals are in."""
+
+    @abstractmethod
+    async def close_game(self, id: str) -> Optional[GameModel]:
+        """Mark an active game as finished now; finished games are left as they are."""
+
+    @abstractmethod
+    async def get_game(self, id: str) -> Optional[GameModel]:
+        ...
+
+    @abstractmethod
+    async def get_history(self, limit: Optional[int] = None) -> List[GameModel]:
+        """Finished games, most recently ended first."""
+
+    async def get_history_json(self, limit: Optional[int] = None) -> bytes:
+        """`get_history` encoded as a JSON array, for backends that can skip the models."""
+        return game_list_adapter.dump_json(await self.get_history(limit))
+
+    # Meals
+
+    @abstractmethod
+    async def submit_meal(self, payload: MealModel) -> MealModel:
+        """Store a player's meal and finish the game once every player has one.
+
+        NotFoundError for an unknown game, ConflictError for a player outside
+        the game or a second meal of the same player.
+        """
+
+    async def close(self):
+        """Release connections or other resources held by the backend."""
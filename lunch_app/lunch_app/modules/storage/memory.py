@@ -0,0 +1,172 @@
+import bisect
+import uuid
+from datetime import datetime, timezone
+from itertools import count, islice
+from typing import Dict, List, Optional, Tuple
+
+from lunch_app.modules.schemas.schema import (
+    GameBase,
+    GameEndedModel,
+    GameModel,
+    GameRoomBase,
+    GameRoomModel,
+    MealModel,
+)
+from lunch_app.modules.room_codes import encode_room_code, is_generated_shape, normalize_room_code
+from lunch_app.modules.storage.base import ConflictError, NotFoundError, Storage
+
+def _now() -> datetime:
+    # Whole seconds, like the BigInteger timestamps in Postgres.
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+class MemoryStorage(Storage):
+    """Process-local storage for benchmarks, replays and development.
+
+    Every lookup the routers and handlers make is served by an index, and
+    no method awaits, so each call is atomic on the event loop. Records are
+    copied on the way in and out, callers cannot mutate stored state.
+    Unlike Postgres, games are not checked against existing rooms.
+    """
+    def __init__(self):
+        self.rooms: Dict[str, GameRoomModel] = {}
+        # code -> room id
+        self.rooms_by_code: Dict[str, str] = {}
+        self.code_sequence = count(1)
+        # is_active -> room ids, in insertion order
+        self.rooms_by_activity: Dict[bool, Dict[str, None]] = {True: {}, False: {}}
+        self.games: Dict[str, GameModel] = {}
+        # room_id -> id of its active game
+        self.active_games: Dict[str, str] = {}
+        # game_id -> player -> meal
+        self.meals: Dict[str, Dict[str, MealModel]] = {}
+        # (ended_at_utc, game_id) of finished games, ascending
+        self.finished: List[Tuple[datetime, str]] = []
+
+    # Rooms
+
+    async def create_room(self, payload: GameRoomBase, id: Optional[str] = None) -> GameRoomModel:
+        code = None if payload.code is None else normalize_room_code(payload.code)
+        if code is None:
+            code = encode_room_code(next(self.code_sequence))
+        elif is_generated_shape(code):
+            raise ConflictError("Codes of this shape are reserved for generated codes.")
+
+        room = GameRoomModel(
+            **payload.model_dump(exclude={"code"}),
+            code=code,
+            id=id or str(uuid.uuid4()),
+            created_at_utc=_now(),
+            is_active=False,
+        )
+        if room.id in self.rooms:
+            raise ConflictError(f"Room with id {room.id} already exists.")
+        if code in self.rooms_by_code:
+            raise ConflictError(f"Room code {code} is already taken.")
+        self.rooms[room.id] = room
+        self.rooms_by_code[code] = room.id
+        self.rooms_by_activity[False][room.id] = None
+        return room.model_copy()
+
+    async def get_room(self, id: str) -> Optional[GameRoomModel]:
+        room = self.rooms.get(id)
+        return room.model_copy() if room else None
+
+    async def get_room_by_code(self, code: str) -> Optional[GameRoomModel]:
+        id = self.rooms_by_code.get(code)
+        return self.rooms[id].model_copy() if id else None
+
+    async def list_rooms(self, is_active: bool) -> List[GameRoomModel]:
+        return [self.rooms[id].model_copy() for id in self.rooms_by_activity[is_active]]
+
+    async def set_room_active(self, id: str, is_active: bool) -> Optional[GameRoomModel]:
+        room = self.rooms.get(id)
+        if room is None:
+            return None
+        if room.is_active != is_active:
+            del self.rooms_by_activity[room.is_active][id]
+            self.rooms_by_activity[is_active][id] = None
+            room = self.rooms[id] = room.model_copy(update={"is_active": is_active})
+        return room.model_copy()
+
+    async def get_room_timeouts(self, id: str) -> Tuple[Optional[int], Optional[int]]:
+        room = self.rooms.get(id)
+        if room is None:
+            return None, None
+        return room.spin_timeout_seconds, room.meal_timeout_seconds
+
+    # Games
+
+    def _game(self, id: str) -> Optional[GameModel]:
+        game = self.games.get(id)
+        return None if game is None else self._with_meals(game)
+
+    def _with_meals(self, game: GameModel) -> GameModel:
+        meals = [meal.model_copy() for meal in self.meals.get(game.id, {}).values()]
+        return game.model_copy(update={"meals": meals}, deep=True)
+
+    def _finish(self, game: GameModel) -> GameModel:
+        ended_at = _now()
+        game = self.games[game.id] = game.model_copy(update={"is_active": False, "ended_at_utc": ended_at})
+        if self.active_games.get(game.room_id) == game.id:
+            del self.active_games[game.room_id]
+        bisect.insort(self.finished, (ended_at, game.id))
+        return game
+
+    async def start_game(self, payload: GameBase) -> GameModel:
+        if payload.room_id in self.active_games:
+            raise ConflictError("A game is already active in this room.")
+        game = GameModel(
+            id=str(uuid.uuid4()),
+            room_id=payload.room_id,
+            players=list(payload.players),
+            created_at_utc=_now(),
+            ended_at_utc=None,
+            is_active=True,
+            winners=None,
+            loser=None,
+            meals=[],
+        )
+        self.games[game.id] = game
+        self.active_games[game.room_id] = game.id
+        return self._with_meals(game)
+
+    async def end_game(self, payload: GameEndedModel) -> Optional[GameModel]:
+        game = self.games.get(payload.id)
+        if game is None:
+            return None
+        self.games[game.id] = game.model_copy(update={"winners": list(payload.winners), "loser": payload.loser})
+        return self._game(game.id)
+
+    async def close_game(self, id: str) -> Optional[GameModel]:
+        game = self.games.get(id)
+        if game is None:
+            return None
+        if game.is_active:
+            self._finish(game)
+        return self._game(id)
+
+    async def get_game(self, id: str) -> Optional[GameModel]:
+        return self._game(id)
+
+    async def get_history(self, limit: Optional[int] = None) -> List[GameModel]:
+        newest_first = islice(reversed(self.finished), limit)
+        return [self._with_meals(self.games[game_id]) for _, game_id in newest_first]
+
+    # Meals
+
+    async def submit_meal(self, payload: MealModel) -> MealModel:
+        game = None if payload.game_id is None else self.games.get(payload.game_id)
+        if game is None:
+            raise NotFoundError(f"Game with id: {payload.game_id} not found.")
+        if payload.player not in game.players:
+            raise ConflictError("Player is not part of this lunch game.")
+
+        meals = self.meals.setdefault(game.id, {})
+        if payload.player in meals:
+            raise ConflictError("Meal already submitted for this player.")
+
+        meal = meals[payload.player] = payload.model_copy()
+        # all meals submitted?
+        if len(meals) == len(game.players) and game.is_active:
+            self._finish(game)
+        return meal.model_copy()
@@ -0,0 +1,28 @@
+from lunch_app.modules.storage.base import Storage
+from lunch_app.modules.types.constants import STORAGE_BACKEND
+
+_storage: Storage | None = None
+
+def create_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    """Build a storage backend: "sql" (Postgres) or "memory"."""
+    if backend == 'sql':
+        from lunch_app.modules.storage.sql import SqlStorage
+        return SqlStorage()
+    if backend == 'memory':
+        from lunch_app.modules.storage.memory import MemoryStorage
+        return MemoryStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+def get_storage() -> Storage:
+    """Process-wide storage; a FastAPI dependency of the routers."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+def set_storage(storage: Storage | None) -> Storage | None:
+    """Replace the process-wide storage and return the previous one."""
+    global _storage
+    previous = _storage
+    _storage = storage
+    return previous
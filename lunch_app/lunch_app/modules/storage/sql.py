@@ -0,0 +1,264 @@
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import JSON, CompoundSelect, Select, Text, func, literal_column, select, union_all, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from lunch_app.database import dispose_engine, get_session_context
+from lunch_app.modules.models.model import ArchivedGame, ArchivedMeal, Game, GameRoom, Meal, room_code_sequence
+from lunch_app.modules.room_codes import encode_room_code, is_generated_shape, normalize_room_code
+from lunch_app.modules.schemas.schema import (
+    GameBase,
+    GameEndedModel,
+    GameModel,
+    GameRoomBase,
+    GameRoomModel,
+    MealModel,
+)
+from lunch_app.modules.storage.base import ConflictError, NotFoundError, Storage
+
+def _select_rooms() -> Select:
+    """Select only the columns GameRoomModel needs, skipping ORM materialization."""
+    return select(*(GameRoom.__table__.c[name] for name in GameRoomModel.model_fields))
+
+def _select_games(game_model, meal_model) -> Select:
+    """Select the GameModel columns of `game_model`, with its meals aggregated to JSON in SQL."""
+    games = game_model.__table__
+    meals = meal_model.__table__
+    meals_json = (
+        select(func.json_agg(func.json_build_object(
+            literal_column("'player'"), meals.c.player,
+            literal_column("'amount'"), meals.c.amount,
+            literal_column("'currency'"), meals.c.currency,
+            literal_column("'game_id'"), meals.c.game_id,
+        )))
+        .where(meals.c.game_id == games.c.id)
+        .scalar_subquery()
+    )
+    return select(
+        games.c.id,
+        games.c.room_id,
+        games.c.players,
+        games.c.created_at_utc,
+        games.c.ended_at_utc,
+        games.c.is_active,
+        games.c.winners,
+        games.c.loser,
+        func.coalesce(meals_json, literal_column("'[]'::json"), type_=JSON).label('meals'),
+    )
+
+def _iso_utc(column):
+    """Epoch seconds as the ISO 8601 string pydantic writes for a UTC datetime."""
+    return func.to_char(func.timezone('UTC', func.to_timestamp(column)), literal_column("'YYYY-MM-DD\"T\"HH24:MI:SS\"Z\"'"))
+
+def _history_query(limit: Optional[int]) -> CompoundSelect:
+    # Games closed before ended_at_utc was recorded have none; they go
+    # last instead of taking the newest places under a limit. Ties are
+    # broken by id like in the memory backend.
+    return union_all(
+        _select_games(Game, Meal).where(Game.is_active == False),
+        _select_games(ArchivedGame, ArchivedMeal),
+    ).order_by(literal_column('ended_at_utc').desc().nulls_last(), literal_column('id').desc()).limit(limit)
+
+def _constraint_name(error: IntegrityError) -> Optional[str]:
+    """Name of the violated constraint, from the asyncpg error behind the DBAPI one."""
+    return getattr(error.orig.__cause__, 'constraint_name', None) if error.orig else None
+
+class SqlStorage(Storage):
+    """Postgres through SQLAlchemy; every call runs in its own session."""
+
+    async def create_room(self, payload: GameRoomBase, id: Optional[str] = None) -> GameRoomModel:
+        async with get_session_context() as session:
+            code = None if payload.code is None else normalize_room_code(payload.code)
+            if code is None:
+                # The permutation of a fresh sequence value cannot collide.
+                code = encode_room_code(await session.scalar(select(room_code_sequence.next_value())))
+            elif is_generated_shape(code):
+                raise ConflictError("Codes of this shape are reserved for generated codes.")
+
+            room = GameRoom(
+                name=payload.name,
+                code=code,
+                spin_timeout_seconds=payload.spin_timeout_seconds,
+                meal_timeout_seconds=payload.meal_timeout_seconds,
+            )
+            if id is not None:
+                room.id = id  # type: ignore[assignment]
+
+            session.add(room)
+            try:
+                await session.commit()
+            except IntegrityError as e:
+                constraint = _constraint_name(e)
+                if constraint == 'ix_game_rooms_code':
+                    raise ConflictError(f"Room code {code} is already taken.")
+                if constraint == 'game_rooms_pkey':
+                    raise ConflictError(f"Room with id {room.id} already exists.")
+                raise
+            await session.refresh(room)
+
+            return GameRoomModel.model_validate(room)
+
+    async def get_room(self, id: str) -> Optional[GameRoomModel]:
+        async with get_session_context() as session:
+            row = (await session.execute(_select_rooms().filter(GameRoom.id == id))).first()
+            return GameRoomModel.model_validate(row._mapping) if row else None
+
+    async def get_room_by_code(self, code: str) -> Optional[GameRoomModel]:
+        async with get_session_context() as session:
+            row = (await session.execute(_select_rooms().filter(GameRoom.code == code))).first()
+            return GameRoomModel.model_validate(row._mapping) if row else None
+
+    async def list_rooms(self, is_active: bool) -> List[GameRoomModel]:
+        async with get_session_context() as session:
+            result = await session.execute(_select_rooms().filter(GameRoom.is_active == is_active))
+            return [GameRoomModel.model_validate(row._mapping) for row in result]
+
+    async def set_room_active(self, id: str, is_active: bool) -> Optional[GameRoomModel]:
+        async with get_session_context() as session:
+            await session.execute(
+                update(GameRoom)
+                .where(GameRoom.id == id)
+                .values(is_active=is_active)
+            )
+            await session.commit()
+
+            row = (await session.execute(_select_rooms().filter(GameRoom.id == id))).first()
+            return GameRoomModel.model_validate(row._mapping) if row else None
+
+    async def get_room_timeouts(self, id: str) -> Tuple[Optional[int], Optional[int]]:
+        async with get_session_context() as session:
+            result = await session.execute(
+                select(GameRoom.spin_timeout_seconds, GameRoom.meal_timeout_seconds).filter(GameRoom.id == id)
+            )
+            row = result.first()
+            return tuple(row) if row else (None, None)
+
+    async def start_game(self, payload: GameBase) -> GameModel:
+        async with get_session_context() as session:
+            result = await session.execute(
+                select(Game.id).filter(Game.room_id == payload.room_id, Game.is_active == True)
+            )
+            if result.first():
+                raise ConflictError("A game is already active in this room.")
+
+            game = Game(
+                room_id=payload.room_id,
+                players=payload.players
+            )
+
+            session.add(game)
+            await session.commit()
+
+            game_saved = await session.scalars(
+                select(Game).filter(Game.id == game.id).options(selectinload(Game.meals))
+            )
+            return GameModel.model_validate(game_saved.first())
+
+    async def end_game(self, payload: GameEndedModel) -> Optional[GameModel]:
+        async with get_session_context() as session:
+            await session.execute(
+                update(Game)
+                .where(Game.id == payload.id)
+                .values(winners=payload.winners, loser=payload.loser)
+            )
+            await session.commit()
+            return await self._get_hot_game(session, payload.id)
+
+    async def close_game(self, id: str) -> Optional[GameModel]:
+        async with get_session_context() as session:
+            await session.execute(
+                update(Game)
+                .where(Game.id == id, Game.is_active == True)
+                .values(is_active=False, ended_at_utc=datetime.now(timezone.utc).timestamp())
+            )
+            await session.commit()
+            return await self._get_hot_game(session, id)
+
+    async def _get_hot_game(self, session, id: str) -> Optional[GameModel]:
+        row = (await session.execute(_select_games(Game, Meal).where(Game.id == id))).first()
+        return GameModel.model_validate(row._mapping) if row else None
+
+    async def get_game(self, id: str) -> Optional[GameModel]:
+        async with get_session_context() as session:
+            # A game is either hot or archived, one round trip covers both.
+            query = union_all(
+                _select_games(Game, Meal).where(Game.id == id),
+                _select_games(ArchivedGame, ArchivedMeal).where(ArchivedGame.id == id),
+            ).limit(1)
+            row = (await session.execute(query)).first()
+            return GameModel.model_validate(row._mapping) if row else None
+
+    async def get_history(self, limit: Optional[int] = None) -> List[GameModel]:
+        async with get_session_context() as session:
+            result = await session.execute(_history_query(limit))
+            return [GameModel.model_validate(row._mapping) for row in result]
+
+    async def get_history_json(self, limit: Optional[int] = None) -> bytes:
+        """The whole response built by Postgres: one text value, no row or model objects."""
+        history = _history_query(limit).subquery()
+        game = func.json_build_object(
+            literal_column("'id'"), history.c.id,
+            literal_column("'room_id'"), history.c.room_id,
+            literal_column("'players'"), history.c.players,
+            literal_column("'created_at_utc'"), _iso_utc(history.c.created_at_utc),
+            literal_column("'ended_at_utc'"), _iso_utc(history.c.ended_at_utc),
+            literal_column("'is_active'"), history.c.is_active,
+            literal_column("'winners'"), history.c.winners,
+            literal_column("'loser'"), history.c.loser,
+            literal_column("'meals'"), history.c.meals,
+        )
+        ordered = aggregate_order_by(game, history.c.ended_at_utc.desc().nulls_last(), history.c.id.desc())
+        query = select(func.coalesce(func.json_agg(ordered), literal_column("'[]'::json")).cast(Text))
+        async with get_session_context() as session:
+            encoded: str = await session.scalar(query)
+            return encoded.encode()
+
+    async def submit_meal(self, payload: MealModel) -> MealModel:
+        async with get_session_context() as session:
+            result = await session.execute(
+                select(Game.players).filter(Game.id == payload.game_id)
+            )
+            players = result.scalar()
+            if players is None:
+                raise NotFoundError(f"Game with id: {payload.game_id} not found.")
+
+            if payload.player not in players:
+                raise ConflictError("Player is not part of this lunch game.")
+
+            existing_meal = await session.execute(
+                select(Meal.id).filter(
+                    Meal.game_id == payload.game_id,
+                    Meal.player == payload.player
+                )
+            )
+            if existing_meal.first():
+                raise ConflictError("Meal already submitted for this player.")
+
+            meal = Meal(
+                player=payload.player,
+                amount=payload.amount,
+                currency=payload.currency,
+                game_id=payload.game_id
+            )
+            session.add(meal)
+            await session.flush()
+
+            # all meals submitted?
+            meals_count = await session.scalar(
+                select(func.count()).select_from(Meal).filter(Meal.game_id == payload.game_id)
+            )
+            if meals_count == len(players):
+                # game completed
+                await session.execute(
+                    update(Game)
+                    .where(Game.id == payload.game_id, Game.is_active == True)
+                    .values(is_active=False, ended_at_utc=datetime.now(timezone.utc).timestamp())
+                )
+            await session.commit()
+
+            return MealModel.model_validate(meal)
+
+    async def close(self):
+        await dispose_engine()
@@ -0,0 +1,117 @@
+import asyncio
+import inspect
+import logging
+import math
+from typing import Any, Callable, Dict, List, Set
+
+from lunch_app.modules.types.constants import TIMER_WHEEL_SLOTS, TIMER_WHEEL_TICK_SECONDS
+
+log = logging.getLogger(__name__)
+
+class Timer:
+    """Handle of a scheduled callback; `cancel()` is O(1)."""
+    __slots__ = ('wheel', 'deadline_tick', 'callback', 'args', 'cancelled')
+
+    def __init__(self, wheel: 'TimerWheel', deadline_tick: int, callback: Callable, args: tuple):
+        self.wheel = wheel
+        self.deadline_tick = deadline_tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.wheel._remove(self)
+
+class TimerWheel:
+    """Hashed timing wheel driven by a single task on the event loop.
+
+    Timers are kept in `slots` buckets by deadline tick, so scheduling and
+    cancelling are O(1) and a tick only looks at one bucket, unlike one
+    `loop.call_later` handle per timer in the loop's heap. Callbacks run at
+    most one tick late. A callback returning an awaitable is run as a task.
+    """
+    def __init__(self, tick: float = TIMER_WHEEL_TICK_SECONDS, slots: int = TIMER_WHEEL_SLOTS):
+        self.tick = tick
+        self.slots: List[Dict[Timer, None]] = [{} for _ in range(slots)]
+        self.current_tick = 0
+        self.pending = 0
+        self._origin: float | None = None
+        self._task: asyncio.Task | None = None
+        self._running: Set[asyncio.Task] = set()
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Run `callback(*args)` once `delay` seconds have passed."""
+        elapsed = self._elapsed_ticks() + max(delay, 0) / self.tick
+        deadline_tick = max(math.ceil(elapsed), self.current_tick + 1)
+        timer = Timer(self, deadline_tick, callback, args)
+        self.slots[deadline_tick % len(self.slots)][timer] = None
+        self.pending += 1
+        return timer
+
+    def _remove(self, timer: Timer):
+        bucket = self.slots[timer.deadline_tick % len(self.slots)]
+        if timer in bucket:
+            del bucket[timer]
+            self.pending -= 1
+
+    def _elapsed_ticks(self) -> float:
+        if self._origin is None:
+            return self.current_tick
+        return (asyncio.get_running_loop().time() - self._origin) / self.tick
+
+    def advance(self, to_tick: int):
+        """Fire every timer due up to and including `to_tick`."""
+        while self.current_tick < to_tick:
+            self.current_tick += 1
+            bucket = self.slots[self.current_tick % len(self.slots)]
+            if not bucket:
+                continue
+            # Timers a whole rotation or more away share the bucket and stay.
+            due = [timer for timer in bucket if timer.deadline_tick <= self.current_tick]
+            for timer in due:
+                del bucket[timer]
+                self.pending -= 1
+                timer.cancelled = True
+                self._fire(timer)
+
+    def _fire(self, timer: Timer):
+        try:
+            result = timer.callback(*timer.args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._running.add(task)
+                task.add_done_callback(self._finished)
+        except Exception as e:
+            log.error("Timer callback %s failed: %s", timer.callback, e)
+
+    def _finished(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Timer task failed: %s", task.exception())
+
+    def start(self):
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            # Ticks already counted before the start keep their meaning.
+            self._origin = loop.time() - self.current_tick * self.tick
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._origin = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            next_tick_at = self._origin + (self.current_tick + 1) * self.tick
+            await asyncio.sleep(max(next_tick_at - loop.time(), 0))
+            # Catch up on ticks missed while the loop was busy.
+            self.advance(int((loop.time() - self._origin) / self.tick))
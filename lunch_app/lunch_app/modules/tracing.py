@@ -0,0 +1,165 @@
+import contextvars
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from lunch_app.modules.types.constants import TRACE_BUFFER_SIZE, TRACE_EXPORTER, TRACE_FILE_PATH, TRACING_ENABLED
+
+log = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """A timed operation; nested spans share the trace id of their parent."""
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attrs', 'start', 'duration', '_token')
+
+    def __init__(self, name: str, attrs: Dict):
+        parent = _current_span.get()
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.trace_id: str = parent.trace_id if parent else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self._token = _current_span.set(self)
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration = time.time() - self.start
+        if error is not None:
+            self.attrs['error'] = repr(error)
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Finished in a different context than it was started in (e.g. a
+            # DB event fired from another task); the parent is still correct.
+            pass
+        tracer.export(self)
+
+    def __enter__(self) -> 'Span':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(exc)
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'duration_ms': self.duration * 1000 if self.duration is not None else None,
+            'attrs': self.attrs,
+        }
+
+class _NoopSpan:
+    """Returned while tracing is disabled so instrumented code costs one call."""
+    __slots__ = ()
+
+    def finish(self, error: Optional[BaseException] = None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+NOOP_SPAN = _NoopSpan()
+
+class RingBufferExporter:
+    """Keeps the most recent finished spans in memory."""
+    def __init__(self, size: int):
+        self.spans: deque = deque(maxlen=size)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def recent(self, limit: int) -> List[Dict]:
+        return [span.to_dict() for span in list(self.spans)[-limit:]]
+
+class FileExporter(RingBufferExporter):
+    """Appends finished spans as JSON lines, and keeps the recent ones in memory."""
+    def __init__(self, path: str, size: int):
+        super().__init__(size)
+        self.file = open(path, 'a', encoding='utf-8', buffering=1 << 16)
+
+    def export(self, span: Span):
+        super().export(span)
+        self.file.write(json.dumps(span.to_dict(), default=str) + '\n')
+
+class Tracer:
+    def __init__(self, enabled: bool, exporter: RingBufferExporter):
+        self.enabled = enabled
+        self.exporter = exporter
+
+    def span(self, name: str, **attrs):
+        """Context manager timing the enclosed block; a no-op when disabled."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(name, attrs)
+
+    def export(self, span: Span):
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            log.error("Failed to export span %s: %s", span.name, e)
+
+def _create_exporter() -> RingBufferExporter:
+    if TRACE_EXPORTER == 'file':
+        return FileExporter(TRACE_FILE_PATH, TRACE_BUFFER_SIZE)
+    return RingBufferExporter(TRACE_BUFFER_SIZE)
+
+tracer = Tracer(TRACING_ENABLED, _create_exporter())
+
+def span(name: str, **attrs):
+    return tracer.span(name, **attrs)
+
+class TracingMiddleware:
+    """ASGI middleware wrapping each HTTP request in a span."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not tracer.enabled or scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        status = {}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        with tracer.span('http.request', method=scope['method'], path=scope['path']) as request_span:
+            await self.app(scope, receive, send_wrapper)
+            request_span.attrs['status'] = status.get('code')
+
+def instrument_engine(engine):
+    """Record a span for every SQL statement executed on the engine."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if tracer.enabled:
+            conn.info.setdefault('trace_spans', []).append(
+                Span('db.statement', {'statement': statement[:200], 'executemany': executemany})
+            )
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('trace_spans')
+        if spans:
+            spans.pop().finish()
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def handle_error(context):
+        spans = context.connection.info.get('trace_spans') if context.connection is not None else None
+        if spans:
+            spans.pop().finish(context.original_exception)
@@ -4,3 +4,125 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
+
+# Where rooms, games and meals live: "sql" (Postgres) or "memory" (lost on
+# restart, for benchmarks and development without a database).
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "sql")
+
+# Finished games older than this are moved to the archive tables.
+ARCHIVE_AFTER_SECONDS = int(os.environ.get("ARCHIVE_AFTER_SECONDS", 7 * 24 * 60 * 60))
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get("ARCHIVE_INTERVAL_SECONDS", 300))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 1000))
+
+# WebSocket heartbeat: the server pings every interval and reaps connections
+# that have not sent anything (including PONG) within the idle timeout.
+WS_HEARTBEAT_INTERVAL_SECONDS = float(os.environ.get("WS_HEARTBEAT_INTERVAL_SECONDS", 15))
+WS_IDLE_TIMEOUT_SECONDS = float(os.environ.get("WS_IDLE_TIMEOUT_SECONDS", 45))
+# Longest a single send or close may take; a peer that does not drain its
+# socket within it is reaped instead of blocking the heartbeat or the room.
+WS_SEND_TIMEOUT_SECONDS = float(os.environ.get("WS_SEND_TIMEOUT_SECONDS", 5))
+
+# permessage-deflate for WebSocket traffic. Room messages repeat the same keys
+# and player names, so context takeover (keeping the window between messages)
+# is on by default; with it even short messages shrink, and only frames below
+# the threshold (e.g. PING) are sent uncompressed. Without context takeover,
+# raise the threshold to a few hundred bytes.
+WS_COMPRESSION_ENABLED = os.environ.get("WS_COMPRESSION_ENABLED", "true").lower() == "true"
+WS_COMPRESSION_MIN_BYTES = int(os.environ.get("WS_COMPRESSION_MIN_BYTES", 32))
+WS_COMPRESSION_LEVEL = int(os.environ.get("WS_COMPRESSION_LEVEL", 6))
+WS_COMPRESSION_MEM_LEVEL = int(os.environ.get("WS_COMPRESSION_MEM_LEVEL", 5))
+WS_COMPRESSION_MAX_WINDOW_BITS = int(os.environ.get("WS_COMPRESSION_MAX_WINDOW_BITS", 12))
+WS_COMPRESSION_SERVER_NO_CONTEXT_TAKEOVER = (
+    os.environ.get("WS_COMPRESSION_SERVER_NO_CONTEXT_TAKEOVER", "false").lower() == "true"
+)
+WS_COMPRESSION_CLIENT_NO_CONTEXT_TAKEOVER = (
+    os.environ.get("WS_COMPRESSION_CLIENT_NO_CONTEXT_TAKEOVER", "false").lower() == "true"
+)
+
+# Admission control, checked before a WebSocket is admitted (0 = no limit).
+# New connections are also refused while the event loop lags behind.
+WS_MAX_PLAYERS_PER_ROOM = int(os.environ.get("WS_MAX_PLAYERS_PER_ROOM", 50))
+WS_MAX_ROOMS = int(os.environ.get("WS_MAX_ROOMS", 2000))
+WS_MAX_CONNECTIONS = int(os.environ.get("WS_MAX_CONNECTIONS", 10_000))
+WS_MAX_SPECTATORS_PER_ROOM = int(os.environ.get("WS_MAX_SPECTATORS_PER_ROOM", 5000))
+WS_ADMISSION_MAX_LOOP_LAG_SECONDS = float(os.environ.get("WS_ADMISSION_MAX_LOOP_LAG_SECONDS", 0.5))
+# The readiness endpoint reports not ready above these.
+READY_MAX_LOOP_LAG_SECONDS = float(os.environ.get("READY_MAX_LOOP_LAG_SECONDS", 0.25))
+READY_MAX_QUEUE_DEPTH = int(os.environ.get("READY_MAX_QUEUE_DEPTH", 5000))
+LOOP_LAG_INTERVAL_SECONDS = float(os.environ.get("LOOP_LAG_INTERVAL_SECONDS", 0.5))
+
+# Generated room codes are a keyed permutation of a sequence; changing the
+# key changes every future code. Resolved codes are cached per process.
+ROOM_CODE_SECRET = os.environ.get("ROOM_CODE_SECRET", "lunch-game")
+ROOM_CODE_CACHE_SIZE = int(os.environ.get("ROOM_CODE_CACHE_SIZE", 10_000))
+
+# Results of mutating WebSocket messages that carry an idempotency_key are
+# kept this long, so a client retrying after a dropped connection gets the
+# original result instead of running the command twice.
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 100_000))
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 600))
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+
+# Spectators get at most one GAME_STATE snapshot per room per interval instead
+# of every frame; a spectator that cannot take a snapshot within the send
+# timeout is dropped. Snapshots queued behind a slow send replace each other.
+SPECTATOR_SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get("SPECTATOR_SNAPSHOT_INTERVAL_SECONDS", 0.25))
+SPECTATOR_SEND_TIMEOUT_SECONDS = float(os.environ.get("SPECTATOR_SEND_TIMEOUT_SECONDS", 5))
+
+# Per-room actors: bounded inbox for backpressure, retired after being idle.
+ROOM_ACTOR_INBOX_SIZE = int(os.environ.get("ROOM_ACTOR_INBOX_SIZE", 256))
+ROOM_ACTOR_IDLE_SECONDS = float(os.environ.get("ROOM_ACTOR_IDLE_SECONDS", 60))
+
+# Game deadlines: players get SPIN_TIMEOUT_SECONDS after the start to spin
+# before the game ends on its own, then MEAL_TIMEOUT_SECONDS to submit meals
+# before the game is closed. Rooms can override both, 0 disables a deadline.
+SPIN_TIMEOUT_SECONDS = int(os.environ.get("SPIN_TIMEOUT_SECONDS", 120))
+MEAL_TIMEOUT_SECONDS = int(os.environ.get("MEAL_TIMEOUT_SECONDS", 2 * 60 * 60))
+# Deadlines fire at most one tick late; timers are spread over the slots.
+TIMER_WHEEL_TICK_SECONDS = float(os.environ.get("TIMER_WHEEL_TICK_SECONDS", 0.5))
+TIMER_WHEEL_SLOTS = int(os.environ.get("TIMER_WHEEL_SLOTS", 512))
+
+# Live room state is written here on shutdown and restored when a room is next
+# used. The Docker image points it at the data volume.
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "room_snapshot.json.gz")
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("DRAIN_TIMEOUT_SECONDS", 10))
+RECONNECT_AFTER_MS = int(os.environ.get("RECONNECT_AFTER_MS", 1000))
+
+# Dropping all tables on startup wipes every game, only enable it for development.
+DB_RESET_ON_STARTUP = os.environ.get("DB_RESET_ON_STARTUP", "false").lower() == "true"
+
+# Event log of all WebSocket traffic: "file", "db" or "none".
+EVENT_LOG_BACKEND = os.environ.get("EVENT_LOG_BACKEND", "file")
+EVENT_LOG_PATH = os.environ.get("EVENT_LOG_PATH", "events.jsonl")
+EVENT_LOG_BATCH_SIZE = int(os.environ.get("EVENT_LOG_BATCH_SIZE", 500))
+EVENT_LOG_FLUSH_SECONDS = float(os.environ.get("EVENT_LOG_FLUSH_SECONDS", 0.5))
+EVENT_LOG_MAX_BUFFER = int(os.environ.get("EVENT_LOG_MAX_BUFFER", 100_000))
+
+# The file event log is rotated at this size (0 never rotates), keeping
+# EVENT_LOG_BACKUP_COUNT older files as events.jsonl.1, .2, ...
+EVENT_LOG_MAX_BYTES = int(os.environ.get("EVENT_LOG_MAX_BYTES", 100 * 1024 * 1024))
+EVENT_LOG_BACKUP_COUNT = int(os.environ.get("EVENT_LOG_BACKUP_COUNT", 3))
+
+# Logging: "json" or "text", and the fraction of records kept per category.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_SAMPLE_RATES = {
+    "broadcast": float(os.environ.get("LOG_SAMPLE_BROADCAST", 0.01)),
+    "state": float(os.environ.get("LOG_SAMPLE_STATE", 0.01)),
+    "admission": float(os.environ.get("LOG_SAMPLE_ADMISSION", 0.1)),
+}
+SQL_ECHO = os.environ.get("SQL_ECHO", "false").lower() == "true"
+
+# Admin endpoints are disabled unless a token is configured.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Tracing: spans go to an in-memory ring buffer ("memory") or also to a file ("file").
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "memory")
+TRACE_FILE_PATH = os.environ.get("TRACE_FILE_PATH", "traces.jsonl")
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", 10_000))
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 60))
+
+# Startup budget mode: skip the DDL in the lifespan and warm up message models
+# after the app starts accepting connections.
+STARTUP_BUDGET_MODE = os.environ.get("STARTUP_BUDGET_MODE", "false").lower() == "true"
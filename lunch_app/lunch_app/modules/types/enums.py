@@ -18,3 +18,6 @@ class MessageType(str, Enum):
     REJOIN = "REJOIN"
     GAME_STATE = "GAME_STATE"
     GAME_RESET = "GAME_RESET"
+    PING = "PING"
+    PONG = "PONG"
+    RECONNECT = "RECONNECT"
@@ -0,0 +1,83 @@
+import asyncio
+import hmac
+import threading
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from lunch_app.modules import log_config
+from lunch_app.modules.profiler import sample_stacks, to_folded
+from lunch_app.modules.tracing import tracer
+from lunch_app.modules.types.constants import ADMIN_TOKEN, PROFILE_MAX_SECONDS
+from lunch_app.router import rooms
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Allow the request only with the configured admin token.
+
+    The router is only mounted when ADMIN_TOKEN is set. The comparison takes
+    the same time wherever the tokens differ, so the token cannot be guessed
+    from response times.
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+router = APIRouter(
+    prefix='/v1/admin',
+    tags=['admin'],
+    dependencies=[Depends(require_admin)]
+)
+
+class LoggingConfigModel(BaseModel):
+    level: Optional[str] = None
+    sample_rates: Optional[Dict[str, float]] = None
+
+@router.get("/logging", response_model=LoggingConfigModel)
+async def get_logging() -> LoggingConfigModel:
+    """Get the current log level and sampling rates."""
+    return LoggingConfigModel(**log_config.get_config())
+
+@router.patch("/logging", response_model=LoggingConfigModel)
+async def set_logging(payload: LoggingConfigModel) -> LoggingConfigModel:
+    """Change the log level and sampling rates at runtime."""
+    try:
+        return LoggingConfigModel(**log_config.configure(payload.level, payload.sample_rates))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid logging configuration: {str(e)}")
+
+class TracingConfigModel(BaseModel):
+    enabled: bool
+
+@router.get("/tracing", response_model=TracingConfigModel)
+async def get_tracing() -> TracingConfigModel:
+    """Check whether tracing is enabled."""
+    return TracingConfigModel(enabled=tracer.enabled)
+
+@router.patch("/tracing", response_model=TracingConfigModel)
+async def set_tracing(payload: TracingConfigModel) -> TracingConfigModel:
+    """Turn tracing on or off at runtime."""
+    tracer.enabled = payload.enabled
+    return TracingConfigModel(enabled=tracer.enabled)
+
+@router.get("/traces", response_model=List[Dict])
+async def get_traces(limit: int = Query(default=100, ge=1, le=10_000)) -> List[Dict]:
+    """Get the most recently finished spans."""
+    return tracer.exporter.recent(limit)
+
+@router.delete("/room_code_cache", response_model=Dict)
+async def clear_room_code_cache() -> Dict:
+    """Forget the resolved room codes, e.g. after a bulk import replaced the rooms."""
+    rooms.room_codes.clear()
+    return rooms.room_codes.stats()
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(default=10, gt=0),
+    interval_ms: float = Query(default=5, gt=0),
+) -> PlainTextResponse:
+    """Sample the event loop thread for N seconds and return a folded flamegraph profile."""
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Profiling is limited to {PROFILE_MAX_SECONDS} seconds.")
+    loop_thread = threading.get_ident()
+    stacks = await asyncio.to_thread(sample_stacks, loop_thread, seconds, interval_ms / 1000)
+    return PlainTextResponse(to_folded(stacks))
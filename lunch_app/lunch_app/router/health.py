@@ -0,0 +1,41 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from lunch_app.router.rooms import room_codes
+from lunch_app.router.ws import admission, idempotency, manager
+
+router = APIRouter(
+    prefix='/v1/health',
+    tags=['health'],
+    dependencies=[]
+)
+
+@router.get("/live")
+async def live():
+    """The process is up and serving requests."""
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "ok"})
+
+@router.get("/ready")
+async def ready():
+    """Load signal for the load balancer: 503 while new connections should go elsewhere."""
+    load = admission.load()
+    is_ready, reasons = admission.readiness(load)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"ready": is_ready, "reasons": reasons, **load},
+    )
+
+@router.get("/metrics")
+async def metrics():
+    """Counters of the in-process caches and fan-out tiers."""
+    spectators = manager.spectators
+    return JSONResponse(content={
+        "idempotency": idempotency.stats(),
+        "room_codes": room_codes.stats(),
+        "spectators": {
+            "connections": spectators.count(),
+            "snapshots_sent": spectators.snapshots_sent,
+            "snapshots_coalesced": spectators.snapshots_coalesced,
+            "dropped": spectators.dropped,
+        },
+    })
@@ -1,11 +1,24 @@
-from typing import List, Optional
+from typing import List, Tuple
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from lunch_app.database import get_session
-from lunch_app.modules.models.model import GameRoom
-from lunch_app.modules.schemas.schema import GameRoomActivityModel, GameRoomBase, GameRoomModel
+from lunch_app.modules.room_codes import RoomCodeCache, normalize_room_code
+from lunch_app.modules.schemas.schema import (
+    GameRoomActivityModel,
+    GameRoomBase,
+    GameRoomCodeModel,
+    GameRoomModel,
+)
+from lunch_app.modules.storage.base import ConflictError, Storage
+from lunch_app.modules.storage.provider import get_storage
+from lunch_app.modules.types.constants import MEAL_TIMEOUT_SECONDS, SPIN_TIMEOUT_SECONDS
+
+async def get_room_timeouts(id: str, storage: Storage) -> Tuple[int, int]:
+    """Spin and meal timeouts of a room, with the server defaults filled in."""
+    spin_timeout, meal_timeout = await storage.get_room_timeouts(id)
+    return (
+        SPIN_TIMEOUT_SECONDS if spin_timeout is None else spin_timeout,
+        MEAL_TIMEOUT_SECONDS if meal_timeout is None else meal_timeout,
+    )
 
 router = APIRouter(
     prefix='/v1/rooms',
@@ -13,96 +26,105 @@ router = APIRouter(
     dependencies=[]
 )
 
+room_codes: RoomCodeCache[GameRoomCodeModel] = RoomCodeCache()
+
 @router.post("/create_room", response_model=GameRoomModel)
 async def create_room(
     payload: GameRoomBase,
-    session: AsyncSession = Depends(get_session)
+    storage: Storage = Depends(get_storage)
 ) -> GameRoomModel:
     """Create a new virtual game room."""
     try:
-        room = GameRoom(
-            name=payload.name,
-            code=payload.code,
-        )
+        return await storage.create_room(payload)
+    except ConflictError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create room: {str(e)}")
 
-        session.add(room)
-        await session.commit()
-        await session.refresh(room)
+@router.get("/join/{code}", response_model=GameRoomCodeModel)
+async def join_by_code(
+    code: str,
+    storage: Storage = Depends(get_storage)
+) -> GameRoomCodeModel:
+    """Resolve a room code to its room; repeated codes are answered from the cache."""
+    try:
+        normalized = normalize_room_code(code)
+        room = room_codes.get(normalized)
+        if room is None:
+            found = await storage.get_room_by_code(normalized)
+            if found is None and normalized != code:
+                # Custom codes created before codes were normalized are stored as typed.
+                found = await storage.get_room_by_code(code)
+            if found is None:
+                # Misses are not cached: the room may be created a moment later.
+                raise HTTPException(status_code=404, detail=f"Room with code {code} not found.")
+            room = GameRoomCodeModel(id=found.id, name=found.name, code=found.code)
+            room_codes.put(normalized, room)
 
-        return GameRoomModel.model_validate(room)
+        return room
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create room: {str(e)}")
-    
+        raise HTTPException(status_code=500, detail=f"Failed to join room by code: {str(e)}")
+
 @router.get("/get_is_active/{id}", response_model=bool)
 async def get_is_active(
     id: str,
-    session: AsyncSession = Depends(get_session)
+    storage: Storage = Depends(get_storage)
 ) -> bool:
     """Check if a specific room is active."""
     try:
-        result = await session.execute(
-            select(GameRoom.is_active).filter(GameRoom.id == id)
-        )
-        is_active = result.scalar()
+        room = await storage.get_room(id)
 
-        if is_active is None:
+        if room is None:
             raise HTTPException(status_code=404, detail=f"Room with id {id} not found.")
-        
-        return is_active
+
+        return room.is_active
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to check if the room is active: {str(e)}")
 
 @router.get("/get_rooms", response_model=List[GameRoomModel])
-async def get_rooms(session: AsyncSession = Depends(get_session)) -> List[GameRoomModel]:
+async def get_rooms(storage: Storage = Depends(get_storage)) -> List[GameRoomModel]:
     """List all rooms that users can join and play game there."""
     try:
-        result = await session.execute(
-            select(GameRoom).filter(GameRoom.is_active == False)
-        )
-
-        rooms = result.scalars().all()
-        return [GameRoomModel.model_validate(room) for room in rooms]
+        return await storage.list_rooms(is_active=False)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get rooms: {str(e)}")
-    
+
 @router.patch("/set_active/{id}", response_model=GameRoomModel)
 async def set_active(
     id: str,
     payload: GameRoomActivityModel,
-    session: AsyncSession = Depends(get_session)
+    storage: Storage = Depends(get_storage)
 ) -> GameRoomModel:
     """Set a room as active."""
     try:
-        await session.execute(
-            update(GameRoom)
-            .where(GameRoom.id == id)
-            .values(is_active=payload.is_active)
-        )
-        await session.commit()
-
-        result = await session.execute(
-            select(GameRoom).filter(GameRoom.id == id)
-        )
-        updated_game_room = result.scalar()
-
-        return GameRoomModel.model_validate(updated_game_room)
+        updated_game_room = await storage.set_room_active(id, payload.is_active)
+
+        if updated_game_room is None:
+            raise HTTPException(status_code=404, detail=f"Room with id {id} not found.")
+
+        return updated_game_room
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set room as active: {str(e)}")
-    
+
 @router.get("/get_room/{id}", response_model=GameRoomModel)
 async def get_room(
     id: str,
-    session: AsyncSession = Depends(get_session)
+    storage: Storage = Depends(get_storage)
 ) -> GameRoomModel:
     """Get details of a specific room based on room id."""
     try:
-        result = await session.execute(
-            select(GameRoom).filter(GameRoom.id == id)
-        )
-        room = result.scalar()
+        room = await storage.get_room(id)
 
-        if not room:
+        if room is None:
             raise HTTPException(status_code=404, detail=f"Room with id {id} not found.")
-        return GameRoomModel.model_validate(room)
+        return room
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get room: {str(e)}")
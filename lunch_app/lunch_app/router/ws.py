@@ -1,20 +1,23 @@
 import random
 import logging
-from typing import Dict
+import time
+from functools import partial
+from typing import Dict, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
-from pydantic import ValidationError
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ValidationError
 
-from lunch_app.database import get_session_context
+from lunch_app.modules import event_log as events
+from lunch_app.modules.admission import AdmissionController
 from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.idempotency import IdempotencyCache
+from lunch_app.modules.log_config import log_context, sampled
+from lunch_app.modules.tracing import span
 from lunch_app.modules.schemas.messages import (
     AllMealsSubmittedNotification,
     ErrorNotification,
     GameEndedNotification,
     GameResetNotification,
     GameStartedNotification,
-    GameStateMessage,
     JoinMessage,
     MealSubmittedNotification,
     PlayerListMessage,
@@ -28,13 +31,16 @@ from lunch_app.modules.schemas.schema import (
     MealModel,
     MealPrice,
 )
+from lunch_app.modules.storage.provider import get_storage
+from lunch_app.modules.types.constants import IDEMPOTENCY_KEY_MAX_LENGTH
 from lunch_app.modules.types.enums import MessageType
 from lunch_app.router.games import (
+    close_game,
     end_game,
     start_game,
     submit_meal,
 )
-from lunch_app.router.rooms import set_active
+from lunch_app.router.rooms import get_room_timeouts, set_active
 
 router = APIRouter(
     prefix='/v1/ws',
@@ -44,6 +50,20 @@ router = APIRouter(
 
 manager = ConnectionManager()
 
+event_log = events.create_event_log()
+
+admission = AdmissionController(manager)
+
+idempotency = IdempotencyCache()
+
+# Commands a client may retry with the same idempotency_key.
+IDEMPOTENT_MESSAGE_TYPES = {
+    MessageType.START_GAME,
+    MessageType.SPIN,
+    MessageType.END_GAME,
+    MessageType.SUBMIT_MEAL,
+}
+
 log = logging.getLogger(__name__)
 
 # TODO: Refactoring
@@ -53,12 +73,29 @@ async def ws_endpoint(
     room_id: str,
     player: str,
 ):
-    await manager.connect(room_id, websocket, player)
+    rejection = admission.admit(room_id)
+    if rejection is not None:
+        # Decided before anything is allocated for the socket. The handshake is
+        # completed only to deliver the close code: browsers do not expose the
+        # HTTP status of a refused handshake.
+        await websocket.accept()
+        await websocket.close(code=rejection.code, reason=rejection.reason)
+        return
+
+    try:
+        await manager.connect(room_id, websocket, player)
+    finally:
+        admission.release(room_id)
+    event_log.record(events.CONNECT, room_id, player)
     try:
         while True:
             data = await websocket.receive_json()
+            manager.touch(room_id, websocket)
             message_type = data.get('type')
 
+            if message_type == MessageType.PONG:
+                continue
+
             if not message_type:
                 error = ErrorNotification(message="Missing message type.")
                 await websocket.send_json(error.model_dump())
@@ -71,34 +108,78 @@ async def ws_endpoint(
                 await websocket.send_json(error.model_dump())
                 continue
 
-            handler = MESSAGE_HANDLERS.get(message_enum)
+            event_log.record(events.MESSAGE, room_id, player, data)
+
+            # Handlers run on the room's actor: messages of one room are
+            # processed strictly in order, different rooms run in parallel.
+            await manager.actors.post(room_id, partial(dispatch_message, room_id, message_enum, data, websocket))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        log.error("Unexpected error: %s", e, extra=log_context(room_id, player))
+    finally:
+        event_log.record(events.DISCONNECT, room_id, player)
+        # Also covers sockets that were already reaped by the heartbeat.
+        await manager.actors.post(room_id, partial(manager.drop_connection, room_id, websocket))
+
+@router.websocket("/rooms/{room_id}/spectate")
+async def spectate_endpoint(websocket: WebSocket, room_id: str):
+    """Watch a room: GAME_STATE snapshots at a capped rate, nothing can be sent but PONG."""
+    rejection = admission.admit_spectator(room_id)
+    if rejection is not None:
+        await websocket.accept()
+        await websocket.close(code=rejection.code, reason=rejection.reason)
+        return
 
-            if handler:
-                if message_enum in {MessageType.SUBMIT_MEAL, MessageType.START_GAME, MessageType.END_GAME}:
-                    async with get_session_context() as session:
-                        await handler(room_id, data, websocket, session)
-                else:
-                    await handler(room_id, data, websocket)
-            else:
-                error = ErrorNotification(message=f"Unhandled message type: {message_type}")
+    try:
+        await manager.actors.call(room_id, partial(manager.restore_room, room_id))
+        await websocket.accept()
+        manager.spectators.add(room_id, websocket)
+    finally:
+        admission.release(room_id, spectator=True)
+    try:
+        while True:
+            data = await websocket.receive_json()
+            manager.spectators.touch(room_id, websocket)
+            if data.get('type') != MessageType.PONG:
+                error = ErrorNotification(message="Spectators cannot send messages.")
                 await websocket.send_json(error.model_dump())
     except WebSocketDisconnect:
-        disconnected_player = manager.get_player_from_websocket(room_id, websocket)
-        manager.disconnect(room_id, websocket)
-        
-        if disconnected_player:
-            notification = UserDisjoinedNotification(player=disconnected_player)
-            await manager.broadcast(room_id, notification)
-        
-        player_list_message = PlayerListMessage(
-            type=MessageType.PLAYER_LIST,
-            players=manager.get_players(room_id)
-        )
-        if manager.get_connections(room_id):
-            await manager.broadcast(room_id, player_list_message)
-        log.info(f"Player disconnected: {disconnected_player}. Updated player list: {player_list_message.players}")
+        pass
     except Exception as e:
-        log.error(f"Unexpected error: {str(e)}")
+        log.error("Unexpected error: %s", e, extra=log_context(room_id, category="connection"))
+    finally:
+        manager.spectators.remove(room_id, websocket)
+
+async def dispatch_message(room_id: str, message_enum: MessageType, data: Dict, websocket: WebSocket):
+    """Run the handler for a message. Must be called from the room's actor.
+
+    A command with an idempotency_key that already succeeded in this room is
+    not run again: the sender gets the original result, nobody else does.
+    Running on the actor means a retry is always checked after the original
+    has finished. Failed commands are not remembered and can be retried.
+    """
+    handler = MESSAGE_HANDLERS.get(message_enum)
+    key = data.get('idempotency_key') if message_enum in IDEMPOTENT_MESSAGE_TYPES else None
+
+    with span("ws.message", room_id=room_id, type=message_enum.value):
+        if key is not None:
+            if not isinstance(key, str) or not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+                error = ErrorNotification(message="Invalid idempotency_key.")
+                await websocket.send_json(error.model_dump())
+                return
+            result = idempotency.get(room_id, key)
+            if result is not None:
+                await websocket.send_text(result)
+                return
+
+        if handler:
+            result = await handler(room_id, data, websocket)
+            if key is not None and result is not None:
+                idempotency.put(room_id, key, result.model_dump_json())
+        else:
+            error = ErrorNotification(message=f"Unhandled message type: {message_enum.value}")
+            await websocket.send_json(error.model_dump())
 
 async def handle_join(room_id: str, data: Dict, websocket: WebSocket):
     try:
@@ -121,13 +202,17 @@ async def handle_join(room_id: str, data: Dict, websocket: WebSocket):
             players=game_state['players']
         )
         await manager.broadcast(room_id, player_list_message)
-        log.info(f"Broadcasting player list: {player_list_message.players}")
+        if sampled("broadcast"):
+            log.info(
+                "Broadcasting player list: %s", player_list_message.players,
+                extra=log_context(room_id, category="broadcast"),
+            )
 
     except ValidationError as ve:
         error = ErrorNotification(message=str(ve))
         await websocket.send_json(error.model_dump())
 
-async def handle_start_game(room_id: str, data: Dict, websocket: WebSocket, session: AsyncSession):
+async def handle_start_game(room_id: str, data: Dict, websocket: WebSocket) -> Optional[BaseModel]:
     try:
         players = data.get('players', [])
         if not players:
@@ -135,10 +220,11 @@ async def handle_start_game(room_id: str, data: Dict, websocket: WebSocket, sess
 
         game_model = await start_game(
             payload=GameBase(room_id=room_id, players=players),
-            session=session
+            storage=get_storage()
         )
 
-        await set_active(room_id, GameRoomActivityModel(is_active=True), session=session)
+        await set_active(room_id, GameRoomActivityModel(is_active=True), storage=get_storage())
+        spin_timeout, meal_timeout = await get_room_timeouts(room_id, get_storage())
 
         manager.set_game_state(room_id, {
             "gameStarted": True,
@@ -148,19 +234,24 @@ async def handle_start_game(room_id: str, data: Dict, websocket: WebSocket, sess
             "winners": [],
             "mealSubmitted": {},
             "scores": {},
+            "spinTimeout": spin_timeout,
+            "mealTimeout": meal_timeout,
         })
+        arm_deadline(room_id, "spin")
 
         notification = GameStartedNotification(
             message="A new game has started!",
             game_id=game_model.id
         )
         await manager.broadcast(room_id, notification)
+        return notification
 
     except Exception as e:
         error = ErrorNotification(message=str(e))
         await websocket.send_json(error.model_dump())
+        return None
 
-async def handle_submit_meal(room_id: str, data: Dict, websocket: WebSocket, session: AsyncSession):
+async def handle_submit_meal(room_id: str, data: Dict, websocket: WebSocket) -> Optional[BaseModel]:
     try:
         player = data.get('player', 'Unknown')
         meal = data.get('meal', {})
@@ -188,7 +279,7 @@ async def handle_submit_meal(room_id: str, data: Dict, websocket: WebSocket, ses
         await submit_meal(
             id=room_id,
             payload=meal_model,
-            session=session
+            storage=get_storage()
         )
 
         notification = MealSubmittedNotification(
@@ -208,14 +299,15 @@ async def handle_submit_meal(room_id: str, data: Dict, websocket: WebSocket, ses
 
         # all players have submitted their meals?
         if manager.all_meals_submitted(room_id):
-            notification = AllMealsSubmittedNotification(
+            all_submitted = AllMealsSubmittedNotification(
                 message="All meals have been submitted!",
             )
 
-            await set_active(room_id, GameRoomActivityModel(is_active=False), session=session)
+            await set_active(room_id, GameRoomActivityModel(is_active=False), storage=get_storage())
 
-            await manager.broadcast(room_id, notification)
+            await manager.broadcast(room_id, all_submitted)
 
+            clear_deadline(room_id)
             manager.reset_meal_submissions(room_id)
 
             manager.reset_game_state(room_id)
@@ -225,51 +317,137 @@ async def handle_submit_meal(room_id: str, data: Dict, websocket: WebSocket, ses
             )
             await manager.broadcast(room_id, game_reset_message)
 
-    except (HTTPException, ValidationError, KeyError, SQLAlchemyError, PermissionError) as e:
+        return notification
+    except (HTTPException, ValidationError, KeyError, PermissionError) as e:
         error = ErrorNotification(message=str(e))
         await websocket.send_json(error.model_dump())
+        return None
     except Exception as e:
         error = ErrorNotification(message=f"Unexpected error: {str(e)}")
         await websocket.send_json(error.model_dump())
+        return None
 
-async def handle_end_game(room_id: str, data: Dict, websocket: WebSocket, session: AsyncSession):
+async def handle_end_game(room_id: str, data: Dict, websocket: WebSocket) -> Optional[BaseModel]:
     try:
         game_id = data.get('game_id', 'Unknown')
         scores = data.get('scores', {})
         if not isinstance(scores, dict):
             raise ValueError("Invalid data format for end game.")
-        players = manager.get_players(room_id)
-        min_score = min(scores.values())
-        losers = [player for player, score in scores.items() if score == min_score]
-        loser = random.choice(losers)
-        winners = [player for player in players if player != loser]
-
-        await end_game(
-            id=room_id,
-            payload=GameEndedModel(id=game_id, winners=winners, loser=loser),
-            session=session
-        )
-
-        notification = GameEndedNotification(
-            message=f"Game over! {loser} loses and pays for lunch!",
-            loser=loser,
-            winners=winners
-        )
-        await manager.broadcast(room_id, notification)
-
-        game_state = manager.get_game_state(room_id)
-        game_state.update({
-            "loser": loser,
-            "winners": winners,
-            "scores": scores,
-        })
-        manager.set_game_state(room_id, game_state)
+        return await finish_game(room_id, game_id, scores, "Game over!")
 
     except Exception as e:
         error = ErrorNotification(message=str(e))
         await websocket.send_json(error.model_dump())
-
-async def handle_spin(room_id: str, data: Dict, websocket: WebSocket):
+        return None
+
+async def finish_game(room_id: str, game_id: str, scores: Dict[str, int], reason: str) -> GameEndedNotification:
+    """Pick the loser by score, persist and announce the result, then arm the meal deadline."""
+    players = manager.get_players(room_id)
+    min_score = min(scores.values())
+    losers = [player for player, score in scores.items() if score == min_score]
+    loser = random.choice(losers)
+    winners = [player for player in players if player != loser]
+
+    await end_game(
+        id=room_id,
+        payload=GameEndedModel(id=game_id, winners=winners, loser=loser),
+        storage=get_storage()
+    )
+
+    notification = GameEndedNotification(
+        message=f"{reason} {loser} loses and pays for lunch!",
+        loser=loser,
+        winners=winners
+    )
+    await manager.broadcast(room_id, notification)
+
+    game_state = manager.get_game_state(room_id)
+    game_state.update({
+        "loser": loser,
+        "winners": winners,
+        "scores": scores,
+    })
+    manager.set_game_state(room_id, game_state)
+    arm_deadline(room_id, "meal")
+    return notification
+
+def arm_deadline(room_id: str, kind: str):
+    """Arm the room's "spin" or "meal" deadline from the timeouts stored at game start."""
+    game_state = manager.get_game_state(room_id)
+    seconds = game_state.get(f"{kind}Timeout")
+    if not seconds:
+        clear_deadline(room_id)
+        return
+    # Wall-clock time, so the deadline survives a restart in the room snapshot.
+    game_state['deadline'] = {"kind": kind, "at": time.time() + seconds}
+    schedule_deadline(room_id)
+
+def schedule_deadline(room_id: str):
+    """Start the timer for the deadline recorded in the room's game state, if any."""
+    game_state = manager.get_game_state(room_id)
+    deadline = game_state.get('deadline')
+    game_id = game_state.get('gameId')
+    if not deadline or game_id is None:
+        return
+    job = partial(run_deadline, room_id, game_id, deadline['kind'])
+    manager.set_deadline(room_id, max(deadline['at'] - time.time(), 0), job)
+
+def schedule_restored_deadlines():
+    """Arm the deadlines of snapshotted rooms, which may never be rejoined.
+
+    Rooms with a deadline are restored right away instead of on first access,
+    otherwise a room everybody left would keep its game open forever.
+    """
+    for room_id, snapshot in list(manager.pending_restore.items()):
+        if snapshot["game_state"].get('deadline') and manager.restore_room(room_id):
+            schedule_deadline(room_id)
+
+def clear_deadline(room_id: str):
+    manager.get_game_state(room_id).pop('deadline', None)
+    manager.cancel_deadline(room_id)
+
+async def run_deadline(room_id: str, game_id: str, kind: str):
+    """Resolve a deadline that expired. Runs on the room's actor."""
+    game_state = manager.get_game_state(room_id)
+    deadline = game_state.get('deadline')
+    if game_state.get('gameId') != game_id or not deadline or deadline['kind'] != kind:
+        # The game moved on between the timer firing and this job running.
+        return
+    del game_state['deadline']
+    log.info("%s deadline expired for game %s", kind, game_id, extra=log_context(room_id, category="deadline"))
+
+    with span("ws.deadline", room_id=room_id, kind=kind):
+        if kind == "spin":
+            await auto_end_game(room_id, game_id)
+        else:
+            await close_timed_out_game(room_id, game_id)
+
+async def auto_end_game(room_id: str, game_id: str):
+    """End the game with the current scores; players who did not spin score 0."""
+    scores = dict(manager.get_game_state(room_id).get('scores', {}))
+    for player in manager.get_players(room_id):
+        scores.setdefault(player, 0)
+    if not scores:
+        # Everybody left before spinning, there is nobody to pay.
+        await close_timed_out_game(room_id, game_id)
+        return
+    await finish_game(room_id, game_id, scores, "Time is up!")
+
+async def close_timed_out_game(room_id: str, game_id: str):
+    """Close the game without the missing meals and free the room for a new game."""
+    await close_game(id=game_id, storage=get_storage())
+    await set_active(room_id, GameRoomActivityModel(is_active=False), storage=get_storage())
+
+    clear_deadline(room_id)
+    manager.reset_meal_submissions(room_id)
+    manager.reset_game_state(room_id)
+    notification = GameResetNotification(
+        type=MessageType.GAME_RESET,
+        message="Time is up, the game has been closed."
+    )
+    await manager.broadcast(room_id, notification)
+
+async def handle_spin(room_id: str, data: Dict, websocket: WebSocket) -> Optional[BaseModel]:
     try:
         player = data.get('player')
         if not player:
@@ -290,9 +468,11 @@ async def handle_spin(room_id: str, data: Dict, websocket: WebSocket):
             score=score
         )
         await manager.broadcast(room_id, notification)
+        return notification
     except Exception as e:
         error = ErrorNotification(message=str(e))
         await websocket.send_json(error.model_dump())
+        return None
 
 async def handle_rejoin(room_id: str, data: Dict, websocket: WebSocket):
     try:
@@ -306,17 +486,7 @@ async def handle_rejoin(room_id: str, data: Dict, websocket: WebSocket):
         game_state['players'] = manager.get_players(room_id)
         manager.set_game_state(room_id, game_state)
 
-        game_state_message = GameStateMessage(
-            type=MessageType.GAME_STATE,
-            gameStarted=game_state.get('gameStarted', False),
-            gameEnded=game_state.get('gameEnded', False),
-            gameId=game_state.get('gameId', ''),
-            players=manager.get_players(room_id),
-            loser=game_state.get('loser', None),
-            winners=game_state.get('winners', []),
-            mealSubmitted=game_state.get('mealSubmitted', {}),
-            scores=game_state.get('scores', {}),
-        )
+        game_state_message = manager.game_state_message(room_id)
         await websocket.send_json(game_state_message.model_dump())
 
         player_list_message = PlayerListMessage(
@@ -0,0 +1,43 @@
+import os
+import uuid
+
+import pytest
+
+# Settings are read when the app modules are imported; the tests keep state in
+# memory and write no event log unless told otherwise.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("EVENT_LOG_BACKEND", "none")
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def scratch_database():
+    """Engine of an empty database on the DATABASE_URL server, dropped afterwards.
+
+    For tests that replace or reshape tables, which must not touch the data
+    in the DATABASE_URL database itself.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from lunch_app.database import get_database_url
+    from lunch_app.modules.types.constants import DATABASE_URL
+
+    if not DATABASE_URL:
+        pytest.skip("DATABASE_URL is not set")
+    admin = create_async_engine(get_database_url(), isolation_level="AUTOCOMMIT")
+    name = f"lunch_test_{uuid.uuid4().hex[:8]}"
+    try:
+        async with admin.connect() as conn:
+            await conn.execute(text(f"CREATE DATABASE {name}"))
+    except Exception as e:
+        await admin.dispose()
+        pytest.skip(f"Cannot create a scratch database: {e}")
+    engine = create_async_engine(admin.url.set(database=name))
+    yield engine
+    await engine.dispose()
+    async with admin.connect() as conn:
+        await conn.execute(text(f"DROP DATABASE {name}"))
+    await admin.dispose()
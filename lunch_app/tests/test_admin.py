@@ -0,0 +1,20 @@
+import pytest
+from fastapi import HTTPException
+
+from lunch_app.router import admin
+
+pytestmark = pytest.mark.anyio
+
+async def test_admin_token_is_required(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    await admin.require_admin("secret")
+    for token in (None, "", "secret2", "Secret"):
+        with pytest.raises(HTTPException) as error:
+            await admin.require_admin(token)
+        assert error.value.status_code == 401
+
+async def test_no_token_configured_refuses_everything(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    for token in (None, ""):
+        with pytest.raises(HTTPException):
+            await admin.require_admin(token)
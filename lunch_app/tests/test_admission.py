@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from lunch_app.modules.admission import AdmissionController
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.router import ws
+
+def _controller(**limits) -> AdmissionController:
+    settings = dict(max_players_per_room=0, max_rooms=0, max_connections=0, max_loop_lag=0, max_spectators_per_room=0)
+    return AdmissionController(ConnectionManager(), **{**settings, **limits})
+
+def _fill(admission: AdmissionController, room_id: str, players: int):
+    for i in range(players):
+        admission.manager.add_player(room_id, object(), f"player-{i}")
+
+def test_full_room_is_refused_with_policy_violation():
+    admission = _controller(max_players_per_room=2)
+    _fill(admission, "room", 2)
+    rejection = admission.admit("room")
+    assert rejection is not None and rejection.code == 1008 and rejection.kind == "room_full"
+    assert admission.admit("other-room") is None
+
+def test_capacity_limits_ask_to_try_again_later():
+    admission = _controller(max_rooms=1)
+    _fill(admission, "room", 1)
+    assert admission.admit("room") is None
+    assert admission.admit("new-room").code == 1013
+
+    admission = _controller(max_connections=2)
+    _fill(admission, "room", 2)
+    assert admission.admit("room").code == 1013
+
+    admission = _controller(max_loop_lag=0.1)
+    admission.lag_monitor.lag = 0.5
+    assert admission.admit("room").code == 1013
+    assert admission.rejected == {"overloaded": 1}
+
+def test_draining_refuses_new_rooms_only():
+    admission = _controller()
+    _fill(admission, "room", 1)
+    admission.manager.draining = True
+    assert admission.admit("room") is None
+    rejection = admission.admit("new-room")
+    assert rejection is not None and rejection.code == 1012
+    assert admission.admit_spectator("room").code == 1012
+
+def test_pending_sockets_count_until_released():
+    admission = _controller(max_players_per_room=2)
+    assert admission.admit("room") is None
+    assert admission.admit("room") is None
+    # A burst cannot overshoot the limit before the actor registers the sockets.
+    assert admission.admit("room").code == 1008
+    admission.release("room")
+    admission.release("room")
+    assert admission.pending == {}
+    assert admission.admit("room") is None
+
+def test_spectators_have_their_own_limit():
+    admission = _controller(max_players_per_room=1, max_spectators_per_room=1)
+    _fill(admission, "room", 1)
+    assert admission.admit_spectator("room") is None
+    assert admission.admit_spectator("room").code == 1008
+    admission.release("room", spectator=True)
+    assert admission.pending_spectators == {}
+
+def test_readiness_reports_reasons():
+    admission = _controller(max_rooms=1)
+    _fill(admission, "room", 1)
+    admission.manager.draining = True
+    ready, reasons = admission.readiness(admission.load())
+    assert not ready and reasons == ["draining", "room limit reached"]
+
+def test_refused_socket_gets_the_close_code(monkeypatch):
+    admission = _controller(max_players_per_room=1)
+    _fill(admission, "room", 1)
+    monkeypatch.setattr(ws, "admission", admission)
+    app = FastAPI()
+    app.include_router(ws.router)
+
+    with TestClient(app).websocket_connect(f"{ws.router.prefix}/rooms/room/ws?player=bob") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008 and closed.value.reason == "Room is full."
+    assert admission.pending == {}
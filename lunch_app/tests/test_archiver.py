@@ -0,0 +1,68 @@
+"""Archiving finished games, against a scratch database on the DATABASE_URL server."""
+import time
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from lunch_app import database
+from lunch_app.database import Base
+from lunch_app.modules.archiver import archive_batch, archive_finished_games
+from lunch_app.modules.models.model import ArchivedGame, ArchivedMeal, Game, Meal
+from lunch_app.modules.schemas.schema import GameBase, GameRoomBase, MealModel
+from lunch_app.modules.storage.sql import SqlStorage
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def storage(scratch_database, monkeypatch):
+    """SqlStorage and the archiver both working on the scratch database."""
+    async with scratch_database.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(database, "_session_factory", async_sessionmaker(bind=scratch_database, expire_on_commit=False))
+    return SqlStorage()
+
+async def _finished_game(storage: SqlStorage, room_id: str, ended_at_utc: int) -> str:
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice", "bob"]))
+    for player in ("alice", "bob"):
+        await storage.submit_meal(MealModel(player=player, amount=10, currency="EUR", game_id=game.id))
+    async with database.get_session_context() as session:
+        await session.execute(update(Game).where(Game.id == game.id).values(ended_at_utc=ended_at_utc))
+        await session.commit()
+    return game.id
+
+async def _count(model) -> int:
+    async with database.get_session_context() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+async def test_old_finished_games_move_to_the_archive(storage):
+    room = await storage.create_room(GameRoomBase(name="room"))
+    old = await _finished_game(storage, room.id, ended_at_utc=1000)
+    recent = await _finished_game(storage, room.id, ended_at_utc=int(time.time()))
+    active = await storage.start_game(GameBase(room_id=room.id, players=["carol"]))
+
+    assert await archive_finished_games(max_age_seconds=3600) == 1
+    assert await _count(Game) == 2 and await _count(Meal) == 2
+    assert await _count(ArchivedGame) == 1 and await _count(ArchivedMeal) == 2
+
+    # Reads span the hot and the archive tables.
+    archived = await storage.get_game(old)
+    assert archived is not None and archived.ended_at_utc.timestamp() == 1000
+    assert archived.meals is not None and sorted(meal.player for meal in archived.meals) == ["alice", "bob"]
+    assert [game.id for game in await storage.get_history()] == [recent, old]
+    assert (await storage.get_game(active.id)).is_active is True
+    assert await archive_finished_games(max_age_seconds=3600) == 0
+
+async def test_archive_batch_moves_oldest_first(storage):
+    room = await storage.create_room(GameRoomBase(name="room"))
+    first = await _finished_game(storage, room.id, ended_at_utc=1000)
+    second = await _finished_game(storage, room.id, ended_at_utc=2000)
+
+    async with database.get_session_context() as session:
+        assert await archive_batch(session, cutoff=3000, batch_size=1) == 1
+    async with database.get_session_context() as session:
+        assert await session.scalar(select(ArchivedGame.id)) == first
+        assert await archive_batch(session, cutoff=3000, batch_size=1) == 1
+    async with database.get_session_context() as session:
+        assert await archive_batch(session, cutoff=3000, batch_size=1) == 0
+    assert (await storage.get_game(second)).is_active is False
@@ -0,0 +1,81 @@
+"""COPY export and import, against a scratch database on the DATABASE_URL server."""
+import pytest
+from sqlalchemy import text
+
+from lunch_app.database import Base
+from lunch_app.modules import bulk_copy
+from lunch_app.modules.room_codes import encode_room_code
+
+pytestmark = pytest.mark.anyio
+
+SEED = [
+    "INSERT INTO game_rooms (id, name, code) VALUES ('room', 'room', :code)",
+    "INSERT INTO games (id, room_id, players, is_active) VALUES ('game', 'room', '{alice,bob}', false)",
+    "INSERT INTO meals (id, game_id, player, amount, currency) VALUES ('meal', 'game', 'alice', 12.5, 'EUR')",
+    "INSERT INTO games_archive (id, room_id, players) VALUES ('old-game', 'room', '{alice}')",
+    "INSERT INTO meals_archive (id, game_id, player, amount, currency) VALUES ('old-meal', 'old-game', 'alice', 3, 'EUR')",
+    "SELECT setval('game_room_code_seq', 7)",
+]
+
+@pytest.fixture
+async def database(scratch_database, monkeypatch):
+    """A scratch database with one row per bulk table, which bulk_copy talks to."""
+    async with scratch_database.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for statement in SEED:
+            await conn.execute(text(statement), {"code": encode_room_code(7)})
+    url = scratch_database.url.set(drivername="postgresql")
+    monkeypatch.setattr(bulk_copy, "get_asyncpg_dsn", lambda: url.render_as_string(hide_password=False))
+    return scratch_database
+
+async def _counts(engine) -> dict:
+    async with engine.connect() as conn:
+        return {
+            table: await conn.scalar(text(f"SELECT count(*) FROM {table}"))
+            for table in bulk_copy.BULK_TABLES
+        }
+
+async def _reset_sequence(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER SEQUENCE game_room_code_seq RESTART"))
+
+@pytest.mark.parametrize("fmt,compress", [("csv", False), ("csv", True), ("binary", False)])
+async def test_export_import_round_trip(database, tmp_path, fmt, compress):
+    exported = await bulk_copy.export_tables(tmp_path, fmt=fmt, compress=compress)
+    assert set(exported) == set(bulk_copy.BULK_TABLES)
+    assert (tmp_path / bulk_copy.SEQUENCE_FILE).read_text() == "7\n"
+
+    await _reset_sequence(database)
+    await bulk_copy.import_tables(tmp_path, fmt=fmt, truncate=True)
+    assert await _counts(database) == dict.fromkeys(bulk_copy.BULK_TABLES, 1)
+    async with database.connect() as conn:
+        # Generated codes continue after the imported ones.
+        assert await conn.scalar(text("SELECT nextval('game_room_code_seq')")) == 8
+        assert await conn.scalar(text("SELECT amount FROM meals")) == 12.5
+
+async def test_import_without_archive_files(database, tmp_path):
+    await bulk_copy.export_tables(tmp_path)
+    for table in ("games_archive", "meals_archive"):
+        (tmp_path / f"{table}.csv").unlink()
+
+    results = await bulk_copy.import_tables(tmp_path, truncate=True)
+    assert set(results) == {"game_rooms", "games", "meals"}
+    assert await _counts(database) == {"game_rooms": 1, "games": 1, "meals": 1, "games_archive": 0, "meals_archive": 0}
+
+async def test_import_needs_the_core_tables(database, tmp_path):
+    await bulk_copy.export_tables(tmp_path)
+    (tmp_path / "meals.csv").unlink()
+
+    with pytest.raises(FileNotFoundError, match="meals"):
+        await bulk_copy.import_tables(tmp_path, truncate=True)
+    # Nothing was truncated.
+    assert await _counts(database) == dict.fromkeys(bulk_copy.BULK_TABLES, 1)
+
+async def test_sequence_falls_back_to_generated_codes(database, tmp_path):
+    await bulk_copy.export_tables(tmp_path)
+    (tmp_path / bulk_copy.SEQUENCE_FILE).unlink()
+
+    await _reset_sequence(database)
+    await bulk_copy.import_tables(tmp_path, truncate=True)
+    async with database.connect() as conn:
+        assert await conn.scalar(text("SELECT nextval('game_room_code_seq')")) == 8
@@ -0,0 +1,84 @@
+import asyncio
+import importlib.util
+import sys
+
+import pytest
+import uvicorn
+from websockets.asyncio.client import connect
+from websockets.frames import CTRL_OPCODES
+
+from lunch_app.modules import compression
+from lunch_app.modules.types.constants import WS_COMPRESSION_MIN_BYTES
+
+pytestmark = [
+    pytest.mark.anyio,
+    # uvicorn and websockets deprecate the legacy protocol that poetry.lock pins.
+    pytest.mark.filterwarnings("ignore::DeprecationWarning"),
+    pytest.mark.filterwarnings("ignore:The `websockets` implementation is deprecated"),
+]
+
+SANSIO_MODULE = "uvicorn.protocols.websockets.websockets_sansio_impl"
+
+def _load_legacy_compression(monkeypatch):
+    """A separate copy of the compression module as it loads on uvicorn < 0.35."""
+    monkeypatch.setitem(sys.modules, SANSIO_MODULE, None)
+    spec = importlib.util.find_spec("lunch_app.modules.compression")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def echo_app(scope, receive, send):
+    assert scope["type"] == "websocket"
+    await receive()
+    await send({"type": "websocket.accept"})
+    while True:
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        await send({"type": "websocket.send", "text": message["text"]})
+
+@pytest.fixture(params=["sansio", "legacy"])
+async def server_url(request, monkeypatch):
+    if request.param == "legacy":
+        module = _load_legacy_compression(monkeypatch)
+        assert module.WebSocketsSansIOProtocol is None
+    else:
+        module = compression
+        if module.WebSocketsSansIOProtocol is None:
+            pytest.skip("uvicorn has no sans-io WebSocket protocol")
+    config = uvicorn.Config(
+        echo_app, host="127.0.0.1", port=0, lifespan="off", log_level="warning",
+        **module.websocket_server_options(),
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"ws://127.0.0.1:{port}"
+    server.should_exit = True
+    await task
+
+async def test_messages_below_threshold_are_sent_uncompressed(server_url):
+    async with connect(server_url) as client:
+        extension = client.protocol.extensions[0]
+        compressed = []
+        decode = extension.decode
+
+        def record(frame, **kwargs):
+            if frame.opcode not in CTRL_OPCODES:
+                compressed.append(frame.rsv1)
+            return decode(frame, **kwargs)
+
+        extension.decode = record
+        messages = ["x" * (WS_COMPRESSION_MIN_BYTES - 1), "large " * WS_COMPRESSION_MIN_BYTES, "y", "large " * 50]
+        for message in messages:
+            await client.send(message)
+            # Skipped messages leave the compressor in sync with the client.
+            assert await client.recv() == message
+
+    assert compressed == [False, True, False, True]
+
+async def test_disabled_compression_negotiates_no_extension(monkeypatch):
+    monkeypatch.setattr(compression, "WS_COMPRESSION_ENABLED", False)
+    assert compression.websocket_server_options() == {"ws_per_message_deflate": False}
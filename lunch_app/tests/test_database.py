@@ -0,0 +1,53 @@
+"""Startup brings a database created by an older version up to the models."""
+import pytest
+from sqlalchemy import inspect, text
+
+from lunch_app.database import Base, upgrade_schema
+from lunch_app.modules.models import model  # noqa: F401  (registers the tables)
+
+pytestmark = pytest.mark.anyio
+
+# game_rooms, games and meals as the first release created them.
+OLD_SCHEMA = [
+    "CREATE TABLE game_rooms (id VARCHAR PRIMARY KEY, name VARCHAR NOT NULL, code VARCHAR NOT NULL,"
+    " created_at_utc BIGINT, is_active BOOLEAN)",
+    "CREATE TABLE games (id VARCHAR PRIMARY KEY, created_at_utc BIGINT, ended_at_utc BIGINT, is_active BOOLEAN,"
+    " players VARCHAR[] NOT NULL, winners VARCHAR[], loser VARCHAR,"
+    " room_id VARCHAR NOT NULL REFERENCES game_rooms (id))",
+    "CREATE TABLE meals (id VARCHAR PRIMARY KEY, player VARCHAR NOT NULL, amount FLOAT NOT NULL,"
+    " currency VARCHAR NOT NULL, game_id VARCHAR NOT NULL REFERENCES games (id))",
+    "INSERT INTO game_rooms (id, name, code) VALUES ('room', 'room', 'ABC')",
+]
+
+@pytest.fixture
+async def old_database(scratch_database):
+    async with scratch_database.begin() as conn:
+        for statement in OLD_SCHEMA:
+            await conn.execute(text(statement))
+    return scratch_database
+
+def _schema(conn):
+    inspector = inspect(conn)
+    return {
+        "room_columns": {column["name"] for column in inspector.get_columns("game_rooms")},
+        "indexes": {
+            index["name"]
+            for table in ("game_rooms", "games", "meals")
+            for index in inspector.get_indexes(table)
+        },
+        "sequences": set(inspector.get_sequence_names()),
+    }
+
+async def test_setup_upgrades_old_tables(old_database):
+    for _ in range(2):
+        async with old_database.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
+
+    async with old_database.connect() as conn:
+        schema = await conn.run_sync(_schema)
+        room = (await conn.execute(text("SELECT name, spin_timeout_seconds FROM game_rooms"))).one()
+    assert {"spin_timeout_seconds", "meal_timeout_seconds"} <= schema["room_columns"]
+    assert {"ix_game_rooms_code", "ix_games_room_id_active", "ix_games_ended_at_utc", "ix_meals_game_id"} <= schema["indexes"]
+    assert "game_room_code_seq" in schema["sequences"]
+    assert tuple(room) == ("room", None)
@@ -0,0 +1,32 @@
+import pytest
+
+from lunch_app.modules.event_log import EventLog, FileEventLogBackend, read_file_events
+
+pytestmark = pytest.mark.anyio
+
+async def test_file_log_is_rotated_and_capped(tmp_path):
+    path = tmp_path / "events.jsonl"
+    backend = FileEventLogBackend(path, max_bytes=200, backup_count=2)
+    event_log = EventLog(backend, batch_size=2)
+    for i in range(40):
+        event_log.record("message", "room", "alice", {"type": "SPIN", "i": i})
+        await event_log.flush()
+    await event_log.stop()
+
+    # The current file may just have been rotated away.
+    names = {p.name for p in tmp_path.iterdir()}
+    assert {"events.jsonl.1", "events.jsonl.2"} <= names <= {"events.jsonl", "events.jsonl.1", "events.jsonl.2"}
+    assert all(p.stat().st_size < 400 for p in tmp_path.iterdir())
+    # The newest events are kept, in order across the files.
+    files = [path.with_name("events.jsonl.2"), path.with_name("events.jsonl.1"), path]
+    seqs = [event["seq"] for file in files if file.exists() for event in read_file_events(file)]
+    assert seqs == list(range(seqs[0], 41))
+
+async def test_rotation_disabled(tmp_path):
+    path = tmp_path / "events.jsonl"
+    event_log = EventLog(FileEventLogBackend(path, max_bytes=0))
+    for i in range(20):
+        event_log.record("message", "room", "alice", {"i": i})
+    await event_log.stop()
+    assert [p.name for p in tmp_path.iterdir()] == ["events.jsonl"]
+    assert len(list(read_file_events(path))) == 20
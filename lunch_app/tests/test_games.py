@@ -0,0 +1,32 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from lunch_app.modules.schemas.schema import GameBase, GameRoomBase
+from lunch_app.modules.storage.base import game_list_adapter
+from lunch_app.modules.storage.memory import MemoryStorage
+from lunch_app.router import games
+
+pytestmark = pytest.mark.anyio
+
+async def test_history_endpoint_returns_encoded_models():
+    storage = MemoryStorage()
+    room = await storage.create_room(GameRoomBase(name="room"))
+    for _ in range(3):
+        game = await storage.start_game(GameBase(room_id=room.id, players=["alice"]))
+        await storage.close_game(game.id)
+
+    response = await games.get_history(2, storage)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == json.loads(game_list_adapter.dump_json(await storage.get_history(2)))
+    assert len(json.loads(response.body)) == 2
+
+async def test_history_endpoint_reports_storage_errors():
+    class BrokenStorage(MemoryStorage):
+        async def get_history_json(self, limit=None):
+            raise RuntimeError("down")
+
+    with pytest.raises(HTTPException) as error:
+        await games.get_history(None, BrokenStorage())
+    assert error.value.status_code == 500 and "down" in error.value.detail
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.schemas.messages import PlayerListMessage
+from lunch_app.modules.types.enums import MessageType
+
+pytestmark = pytest.mark.anyio
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.received = []
+        self.close_code = None
+
+    async def send_json(self, data):
+        if self.fail:
+            raise ConnectionResetError()
+        self.received.append(data)
+
+    async def send_text(self, data):
+        await self.send_json(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+    def types(self):
+        return [message["type"] for message in self.received]
+
+@pytest.fixture
+async def manager():
+    manager = ConnectionManager()
+    yield manager
+    await manager.stop_heartbeat()
+    await manager.actors.stop()
+
+async def test_failed_send_reaps_like_a_disconnect(manager):
+    alice, bob = FakeWebSocket(), FakeWebSocket(fail=True)
+    manager.add_player("room", alice, "alice")
+    manager.add_player("room", bob, "bob")
+
+    await manager.broadcast("room", PlayerListMessage(players=["alice", "bob"]))
+
+    assert manager.get_players("room") == ["alice"]
+    assert manager.reaped_connections == 1
+    assert bob.close_code == 1001
+    assert alice.types() == [MessageType.PLAYER_LIST.value, MessageType.USER_DISJOINED.value, MessageType.PLAYER_LIST.value]
+    assert alice.received[1]["player"] == "bob" and alice.received[2]["players"] == ["alice"]
+
+async def test_heartbeat_pings_and_reaps_idle_connections(manager):
+    alice, bob = FakeWebSocket(), FakeWebSocket()
+    manager.add_player("room", alice, "alice")
+    manager.add_player("room", bob, "bob")
+    manager.start_heartbeat(interval=0.01, idle_timeout=0.1)
+
+    # alice answers every ping, bob never does.
+    for _ in range(30):
+        await asyncio.sleep(0.01)
+        manager.touch("room", alice)
+    await manager.actors.join()
+
+    assert MessageType.PING.value in bob.types()
+    assert manager.get_players("room") == ["alice"]
+    assert manager.reaped_connections == 1 and bob.close_code == 1001
+    assert MessageType.USER_DISJOINED.value in alice.types()
+
+async def test_failed_ping_reaps_the_connection(manager):
+    manager.add_player("room", FakeWebSocket(fail=True), "alice")
+    manager.start_heartbeat(interval=0.01, idle_timeout=60)
+    await asyncio.sleep(0.05)
+    await manager.actors.join()
+
+    assert manager.get_players("room") == []
+    assert manager.reaped_connections == 1
+    assert "room" not in manager.active_connections
+
+async def test_reaping_twice_counts_once(manager):
+    websocket = FakeWebSocket()
+    manager.add_player("room", websocket, "alice")
+    await manager.reap("room", websocket, "test")
+    await manager.reap("room", websocket, "test")
+    assert manager.reaped_connections == 1
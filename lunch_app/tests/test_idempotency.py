@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from lunch_app.modules import idempotency as idempotency_module
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.idempotency import IdempotencyCache
+from lunch_app.modules.schemas.schema import GameRoomBase
+from lunch_app.modules.storage import provider
+from lunch_app.modules.storage.memory import MemoryStorage
+from lunch_app.modules.types.enums import MessageType
+from lunch_app.router import ws
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def send_json(self, data):
+        self.received.append(data)
+
+    async def send_text(self, data):
+        self.received.append(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        pass
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(idempotency_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_cache_hit_and_ttl(clock):
+    cache = IdempotencyCache(size=10, ttl=5)
+    cache.put("room", "key", "result")
+    assert cache.get("room", "key") == "result"
+    assert cache.get("other-room", "key") is None
+    clock[0] += 5
+    assert cache.get("room", "key") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+def test_cache_evicts_oldest_beyond_size(clock):
+    cache = IdempotencyCache(size=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.put("room", key, key)
+    assert cache.get("room", "a") is None
+    assert cache.get("room", "b") == "b" and cache.get("room", "c") == "c"
+
+def test_cache_disabled_with_size_zero(clock):
+    cache = IdempotencyCache(size=0, ttl=60)
+    cache.put("room", "key", "result")
+    assert cache.get("room", "key") is None
+
+@pytest.fixture
+async def room(monkeypatch):
+    """A room with two players on a fresh manager, cache and memory storage."""
+    storage = MemoryStorage()
+    monkeypatch.setattr(provider, "_storage", storage)
+    monkeypatch.setattr(ws, "manager", ConnectionManager())
+    monkeypatch.setattr(ws, "idempotency", IdempotencyCache())
+    room = await storage.create_room(GameRoomBase(name="room"))
+    host, guest = FakeWebSocket(), FakeWebSocket()
+    ws.manager.add_player(room.id, host, "alice")
+    ws.manager.add_player(room.id, guest, "bob")
+    yield room.id, host, guest
+    await ws.manager.actors.stop()
+
+@pytest.mark.anyio
+async def test_retried_command_runs_once(room):
+    room_id, host, guest = room
+    data = {"type": MessageType.START_GAME.value, "players": ["alice", "bob"], "idempotency_key": "start-1"}
+
+    await ws.dispatch_message(room_id, MessageType.START_GAME, data, host)
+    await ws.dispatch_message(room_id, MessageType.START_GAME, data, host)
+
+    # Only the sender gets the cached result again, without an error.
+    assert [message["type"] for message in host.received] == [MessageType.GAME_STARTED.value] * 2
+    assert host.received[0] == host.received[1]
+    assert [message["type"] for message in guest.received] == [MessageType.GAME_STARTED.value]
+    assert ws.idempotency.stats()["hits"] == 1
+
+@pytest.mark.anyio
+async def test_failed_command_is_not_cached(room):
+    room_id, host, _ = room
+    data = {"type": MessageType.START_GAME.value, "players": [], "idempotency_key": "start-1"}
+
+    await ws.dispatch_message(room_id, MessageType.START_GAME, data, host)
+    assert host.received[-1]["type"] == MessageType.ERROR.value
+    assert ws.idempotency.stats()["entries"] == 0
+
+    await ws.dispatch_message(room_id, MessageType.START_GAME, {**data, "players": ["alice", "bob"]}, host)
+    assert host.received[-1]["type"] == MessageType.GAME_STARTED.value
+
+@pytest.mark.anyio
+async def test_invalid_key_is_refused(room):
+    room_id, host, guest = room
+    data = {"type": MessageType.START_GAME.value, "players": ["alice"], "idempotency_key": "x" * 129}
+
+    await ws.dispatch_message(room_id, MessageType.START_GAME, data, host)
+    assert host.received == [{"type": MessageType.ERROR.value, "message": "Invalid idempotency_key."}]
+    assert guest.received == []
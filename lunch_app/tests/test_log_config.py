@@ -0,0 +1,75 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from lunch_app.modules import log_config
+from lunch_app.modules.log_config import (
+    LazyQueueHandler,
+    configure,
+    get_config,
+    log_context,
+    sampled,
+    setup_logging,
+    shutdown_logging,
+)
+
+@pytest.fixture
+def stream():
+    """Logging set up to write into a buffer; the previous configuration is restored afterwards."""
+    app_logger = logging.getLogger("lunch_app")
+    saved = (app_logger.handlers, app_logger.propagate, app_logger.level, dict(log_config._sample_rates))
+    shutdown_logging()
+    buffer = io.StringIO()
+    setup_logging(level="INFO", fmt="json", sample_rates={"broadcast": 0.0, "state": 1.0}, stream=buffer)
+    yield buffer
+    shutdown_logging()
+    app_logger.handlers, app_logger.propagate, app_logger.level = saved[:3]
+    log_config._sample_rates.clear()
+    log_config._sample_rates.update(saved[3])
+
+def _records(buffer: io.StringIO):
+    # Stopping the listener flushes the queue.
+    shutdown_logging()
+    return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+def test_records_are_json_with_context(stream):
+    log = logging.getLogger("lunch_app.test")
+    log.info("Player %s joined", "alice", extra=log_context("room", "alice", "connection", "JOIN"))
+    log.debug("below the level")
+
+    [record] = _records(stream)
+    assert record["msg"] == "Player alice joined" and record["level"] == "INFO"
+    assert record["logger"] == "lunch_app.test"
+    assert (record["room_id"], record["player"], record["category"], record["message_type"]) == (
+        "room", "alice", "connection", "JOIN",
+    )
+
+def test_queue_handler_leaves_formatting_to_the_listener():
+    formatted = []
+
+    class Arg:
+        def __str__(self):
+            formatted.append(self)
+            return "arg"
+
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    handler.emit(logging.LogRecord("lunch_app.test", logging.INFO, __file__, 1, "value %s", (Arg(),), None))
+    record = handler.queue.get_nowait()
+    assert formatted == [] and record.msg == "value %s"
+    assert record.getMessage() == "value arg"
+
+def test_sampling_and_runtime_configuration(stream):
+    assert not any(sampled("broadcast") for _ in range(100))
+    assert all(sampled("state") for _ in range(100))
+    # Categories without a rate are always logged.
+    assert sampled("connection")
+
+    config = configure(level="warning", sample_rates={"broadcast": 1.0})
+    assert config == get_config()
+    assert config["level"] == "WARNING" and config["sample_rates"]["broadcast"] == 1.0
+    assert sampled("broadcast")
+    logging.getLogger("lunch_app.test").info("dropped")
+    assert _records(stream) == []
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from lunch_app.modules.room_actor import RoomActorRegistry
+
+pytestmark = pytest.mark.anyio
+
+async def test_jobs_of_a_room_run_in_order():
+    actors = RoomActorRegistry()
+    order = []
+
+    async def job(i: int):
+        # Yield to the loop so a second consumer would interleave.
+        await asyncio.sleep(0)
+        order.append(i)
+
+    for i in range(50):
+        await actors.post("room", lambda i=i: job(i))
+    await actors.join()
+    await actors.stop()
+    assert order == list(range(50))
+
+async def test_rooms_run_in_parallel():
+    actors = RoomActorRegistry()
+    release = asyncio.Event()
+    finished = []
+
+    async def blocked():
+        await release.wait()
+        finished.append("blocked")
+
+    await actors.post("slow", blocked)
+    assert await actors.call("fast", lambda: "fast") == "fast"
+    assert finished == []
+    release.set()
+    await actors.join()
+    await actors.stop()
+    assert finished == ["blocked"]
+
+async def test_call_returns_result_and_raises_error():
+    actors = RoomActorRegistry()
+
+    async def add():
+        return 1 + 1
+
+    def fail():
+        raise ValueError("boom")
+
+    assert await actors.call("room", add) == 2
+    with pytest.raises(ValueError, match="boom"):
+        await actors.call("room", fail)
+    # A failed job does not stop the actor.
+    assert await actors.call("room", lambda: "still running") == "still running"
+    await actors.stop()
+
+async def test_idle_actor_is_retired():
+    actors = RoomActorRegistry(idle_timeout=0.01)
+    await actors.call("room", lambda: None)
+    assert "room" in actors.actors
+    await asyncio.sleep(0.05)
+    assert "room" not in actors.actors
+    # The next job gets a new actor.
+    assert await actors.call("room", lambda: "again") == "again"
+    await actors.stop()
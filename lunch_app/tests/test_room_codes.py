@@ -0,0 +1,78 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from lunch_app.modules.room_codes import (
+    ALPHABET,
+    CODE_LENGTH,
+    RoomCodeCache,
+    decode_room_code,
+    encode_room_code,
+    is_generated_shape,
+    normalize_room_code,
+    permute,
+    unpermute,
+)
+from lunch_app.modules.schemas.schema import GameRoomBase
+from lunch_app.modules.storage.memory import MemoryStorage
+from lunch_app.router import rooms
+
+def test_permutation_is_a_bijection():
+    numbers = list(range(5000)) + [random.randrange(1 << 40) for _ in range(5000)] + [(1 << 40) - 1]
+    values = [permute(number) for number in numbers]
+    assert len(set(values)) == len(set(numbers))
+    assert all(unpermute(value) == number for number, value in zip(numbers, values))
+
+def test_generated_codes_round_trip():
+    for number in [0, 1, 2, 12345, (1 << 40) - 1]:
+        code = encode_room_code(number)
+        assert len(code) == CODE_LENGTH and set(code) <= set(ALPHABET)
+        assert is_generated_shape(code)
+        assert decode_room_code(code) == number
+
+def test_consecutive_numbers_do_not_give_consecutive_codes():
+    codes = [encode_room_code(number) for number in range(1, 4)]
+    assert len({code[:4] for code in codes}) > 1
+
+def test_custom_code_shapes():
+    assert not is_generated_shape("ABC")
+    assert not is_generated_shape("ABCDEFGU")  # U is not in the alphabet
+    assert not is_generated_shape("abcdefgh")
+
+def test_cache_evicts_least_recently_used():
+    cache: RoomCodeCache[str] = RoomCodeCache(size=2)
+    cache.put("a", "room-a")
+    cache.put("b", "room-b")
+    assert cache.get("a") == "room-a"
+    cache.put("c", "room-c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "room-a" and cache.get("c") == "room-c"
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+    cache.clear()
+    assert cache.get("a") is None and cache.stats()["entries"] == 0
+
+def test_codes_are_normalized():
+    code = encode_room_code(12345)
+    misread = code.lower().replace("1", "l").replace("0", "o")
+    assert normalize_room_code(misread) == code
+    assert normalize_room_code(f" {code.lower()} ") == code
+    # Custom codes are only upper-cased.
+    assert normalize_room_code("lunch") == "LUNCH"
+
+@pytest.mark.anyio
+async def test_join_by_code_ignores_case_and_misread_characters(monkeypatch):
+    monkeypatch.setattr(rooms, "room_codes", RoomCodeCache())
+    storage = MemoryStorage()
+    room = await storage.create_room(GameRoomBase(name="room"))
+    custom = await storage.create_room(GameRoomBase(name="custom", code="lunch"))
+
+    typed = room.code.lower().replace("0", "o").replace("1", "i")
+    assert (await rooms.join_by_code(typed, storage)).id == room.id
+    assert (await rooms.join_by_code(room.code, storage)).id == room.id
+    assert rooms.room_codes.stats()["hits"] == 1
+    assert (await rooms.join_by_code("Lunch", storage)).id == custom.id
+    with pytest.raises(HTTPException) as e:
+        await rooms.join_by_code("missing", storage)
+    assert e.value.status_code == 404
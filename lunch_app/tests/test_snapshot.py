@@ -0,0 +1,106 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.snapshot import load_snapshot, write_snapshot
+from lunch_app.modules.types.enums import MessageType
+from lunch_app.router import ws
+
+pytestmark = pytest.mark.anyio
+
+ROOM = {
+    "game_state": {"gameStarted": True, "gameId": "game-1", "scores": {"alice": 42}},
+    "meal_submissions": ["alice"],
+    "scores": {"alice": 42},
+}
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.received.append(data)
+
+    async def send_text(self, data):
+        self.received.append(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "snapshot.json.gz"
+    write_snapshot(path, {"room": ROOM})
+    assert load_snapshot(path) == {"room": ROOM}
+    # A snapshot is restored once only.
+    assert not path.exists()
+    assert load_snapshot(path) == {}
+
+def test_snapshot_of_another_version_is_ignored(tmp_path):
+    path = tmp_path / "snapshot.json.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(json.dumps({"version": 0, "rooms": {"room": ROOM}}).encode())
+    assert load_snapshot(path) == {}
+
+async def test_drain_snapshots_rooms_and_asks_clients_to_reconnect(tmp_path):
+    manager = ConnectionManager()
+    player = FakeWebSocket()
+    manager.add_player("room", player, "alice")
+    manager.set_game_state("room", dict(ROOM["game_state"]))
+    manager.mark_meal_submitted("room", "alice")
+    manager.scores["room"] = {"alice": 42}
+    # A room nobody came back to is carried over to the next process.
+    manager.pending_restore = {"idle-room": ROOM}
+
+    await manager.drain(tmp_path / "snapshot.json.gz")
+
+    assert player.received[-1]["type"] == MessageType.RECONNECT.value
+    assert player.received[-1]["retry_after_ms"] > 0
+    assert player.close_code == 1012
+    assert manager.draining
+    assert load_snapshot(tmp_path / "snapshot.json.gz") == {"room": ROOM, "idle-room": ROOM}
+    await manager.actors.stop()
+
+@pytest.fixture
+def restarted(monkeypatch, tmp_path):
+    """A fresh manager that loaded a snapshot of "room"."""
+    path = tmp_path / "snapshot.json.gz"
+    write_snapshot(path, {"room": ROOM})
+    manager = ConnectionManager()
+    manager.load_snapshot(path)
+    monkeypatch.setattr(ws, "manager", manager)
+    return manager
+
+async def test_room_is_restored_on_join(restarted):
+    websocket = FakeWebSocket()
+    await ws.dispatch_message("room", MessageType.JOIN, {"type": MessageType.JOIN.value, "player": "alice"}, websocket)
+
+    assert restarted.game_states["room"]["gameId"] == "game-1"
+    assert restarted.meal_submissions["room"] == {"alice"}
+    assert restarted.scores["room"] == {"alice": 42}
+    assert restarted.pending_restore == {}
+    await restarted.actors.stop()
+
+async def test_room_is_restored_on_connect(restarted):
+    await restarted.connect("room", FakeWebSocket(), "alice")
+    assert restarted.game_state_message("room").gameId == "game-1"
+    await restarted.actors.stop()
+
+def test_room_is_restored_for_a_spectator(restarted):
+    app = FastAPI()
+    app.include_router(ws.router)
+    with TestClient(app).websocket_connect(f"{ws.router.prefix}/rooms/room/spectate"):
+        assert restarted.game_states["room"]["gameId"] == "game-1"
+
+async def test_live_state_is_not_overwritten(restarted):
+    restarted.add_player("room", FakeWebSocket(), "alice")
+    restarted.game_states["room"]["gameId"] = "game-2"
+    assert not restarted.restore_room("room")
+    assert restarted.game_states["room"]["gameId"] == "game-2"
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from lunch_app.modules.connection_manager import ConnectionManager
+from lunch_app.modules.schemas.messages import PlayerListMessage
+from lunch_app.modules.spectators import SpectatorTier
+from lunch_app.modules.types.enums import MessageType
+
+pytestmark = pytest.mark.anyio
+
+class Snapshot(BaseModel):
+    room_id: str
+    version: int
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.received = []
+        self.close_code = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def send_text(self, data):
+        await self.unblocked.wait()
+        self.received.append(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+@pytest.fixture
+def tier():
+    versions = {"room": 0}
+
+    def snapshot(room_id: str) -> Snapshot:
+        versions[room_id] += 1
+        return Snapshot(room_id=room_id, version=versions[room_id])
+
+    return SpectatorTier(snapshot, interval=60, send_timeout=0.05)
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def test_changes_between_flushes_give_one_snapshot(tier):
+    websocket = FakeWebSocket()
+    tier.add("room", websocket)
+    for _ in range(100):
+        tier.mark_dirty("room")
+    # Rooms without spectators are not tracked at all.
+    tier.mark_dirty("unwatched")
+    assert list(tier.dirty) == ["room"]
+
+    tier.flush()
+    tier.flush()
+    await _settle()
+    assert websocket.received == [{"room_id": "room", "version": 1}]
+    assert tier.snapshots_sent == 1
+
+async def test_slow_spectator_only_gets_the_latest_snapshot(tier):
+    slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+    tier.add("room", slow)
+    tier.add("room", fast)
+    tier.send_timeout = 1
+    for _ in range(4):
+        tier.mark_dirty("room")
+        tier.flush()
+        await _settle()
+
+    # The slow spectator holds its first snapshot in flight and the newest one
+    # pending; the two in between were replaced.
+    assert [message["version"] for message in fast.received] == [1, 2, 3, 4]
+    assert tier.snapshots_coalesced == 2
+    slow.unblocked.set()
+    await _settle()
+    assert [message["version"] for message in slow.received] == [1, 4]
+
+async def test_spectator_is_dropped_when_a_send_times_out(tier):
+    stuck, other = FakeWebSocket(blocked=True), FakeWebSocket()
+    tier.add("room", stuck)
+    tier.add("room", other)
+    tier.flush()
+    await asyncio.sleep(0.1)
+
+    assert tier.dropped == 1 and stuck.close_code == 1001
+    assert tier.count("room") == 1 and other.received == [{"room_id": "room", "version": 1}]
+
+async def test_player_broadcasts_reach_spectators_as_game_state():
+    manager = ConnectionManager()
+    manager.spectators.interval = 0.01
+    spectator = FakeWebSocket()
+    manager.spectators.add("room", spectator)
+    manager.spectators.start()
+    manager.add_player("room", FakeWebSocket(), "alice")
+    await manager.broadcast("room", PlayerListMessage(players=["alice"]))
+    await asyncio.sleep(0.05)
+    await manager.spectators.stop()
+
+    assert spectator.received[-1]["type"] == MessageType.GAME_STATE.value
+    assert spectator.received[-1]["players"] == ["alice"]
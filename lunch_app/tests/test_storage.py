@@ -0,0 +1,205 @@
+"""Behaviour every storage backend has to share.
+
+Each test runs against the memory backend and against Postgres at
+DATABASE_URL; the SQL runs are skipped when no database is reachable. Tests
+create their own rooms with unique ids, so they can run against a database
+that already holds data.
+"""
+import json
+import uuid
+from typing import Optional
+
+import pytest
+
+from lunch_app.modules.room_codes import is_generated_shape
+from lunch_app.modules.schemas.schema import GameBase, GameEndedModel, GameRoomBase, MealModel
+from lunch_app.modules.storage.base import ConflictError, NotFoundError, Storage, game_list_adapter
+from lunch_app.modules.storage.provider import create_storage
+
+pytestmark = pytest.mark.anyio
+
+async def _require_database():
+    from lunch_app.database import get_asyncpg_dsn
+    from lunch_app.modules.types.constants import DATABASE_URL
+    import asyncpg
+
+    if not DATABASE_URL:
+        pytest.skip("DATABASE_URL is not set")
+    try:
+        conn = await asyncpg.connect(get_asyncpg_dsn(), timeout=2)
+    except Exception as e:
+        pytest.skip(f"No database at DATABASE_URL: {e}")
+    await conn.close()
+
+@pytest.fixture(params=["memory", "sql"])
+async def storage(request):
+    if request.param == "sql":
+        await _require_database()
+        from lunch_app.database import setup_database
+        await setup_database()
+    storage = create_storage(request.param)
+    yield storage
+    await storage.close()
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+async def _new_room(storage: Storage, **timeouts) -> str:
+    room = await storage.create_room(GameRoomBase(name=_unique("room"), code=_unique("code"), **timeouts))
+    return room.id
+
+async def test_rooms_round_trip(storage: Storage):
+    payload = GameRoomBase(name=_unique("room"), code=_unique("code"), spin_timeout_seconds=30)
+    room = await storage.create_room(payload)
+    # Codes are stored normalized, custom codes just upper-cased.
+    assert room.id and room.name == payload.name and room.code == payload.code.upper()
+    assert room.is_active is False and room.created_at_utc is not None
+    assert await storage.get_room(room.id) == room
+    assert await storage.get_room(_unique("missing")) is None
+
+    room_id = _unique("explicit")
+    assert (await storage.create_room(payload.model_copy(update={"code": None}), id=room_id)).id == room_id
+
+async def test_room_codes(storage: Storage):
+    generated = [await storage.create_room(GameRoomBase(name=_unique("room"))) for _ in range(3)]
+    codes = [room.code for room in generated]
+    assert len(set(codes)) == 3 and all(is_generated_shape(code) for code in codes)
+    for room in generated:
+        assert await storage.get_room_by_code(room.code) == room
+
+    custom = await storage.create_room(GameRoomBase(name=_unique("room"), code=_unique("code")))
+    found = await storage.get_room_by_code(custom.code)
+    assert found is not None and found.id == custom.id
+    with pytest.raises(ConflictError, match="already taken"):
+        await storage.create_room(GameRoomBase(name=_unique("room"), code=custom.code.lower()))
+    with pytest.raises(ConflictError, match="already exists"):
+        await storage.create_room(GameRoomBase(name=_unique("room"), code=_unique("code")), id=custom.id)
+    with pytest.raises(ConflictError):
+        await storage.create_room(GameRoomBase(name=_unique("room"), code=codes[0]))
+    with pytest.raises(ConflictError, match="reserved"):
+        await storage.create_room(GameRoomBase(name=_unique("room"), code=codes[0].lower()))
+    with pytest.raises(ConflictError):
+        await storage.create_room(GameRoomBase(name=_unique("room"), code="ZZZZ0000"))
+    assert await storage.get_room_by_code(_unique("missing")) is None
+
+async def test_room_activity(storage: Storage):
+    room_id = await _new_room(storage)
+    assert room_id in {room.id for room in await storage.list_rooms(False)}
+
+    room = await storage.set_room_active(room_id, True)
+    assert room is not None and room.is_active is True
+    assert room_id in {room.id for room in await storage.list_rooms(True)}
+    assert room_id not in {room.id for room in await storage.list_rooms(False)}
+
+    inactive = await storage.set_room_active(room_id, False)
+    assert inactive is not None and inactive.is_active is False
+    assert room_id in {room.id for room in await storage.list_rooms(False)}
+    assert await storage.set_room_active(_unique("missing"), True) is None
+
+async def test_room_timeouts(storage: Storage):
+    room_id = await _new_room(storage, spin_timeout_seconds=30, meal_timeout_seconds=0)
+    assert await storage.get_room_timeouts(room_id) == (30, 0)
+    assert await storage.get_room_timeouts(await _new_room(storage)) == (None, None)
+    assert await storage.get_room_timeouts(_unique("missing")) == (None, None)
+
+async def test_one_active_game_per_room(storage: Storage):
+    room_id = await _new_room(storage)
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice", "bob"]))
+    assert game.is_active is True and game.room_id == room_id
+    assert game.players == ["alice", "bob"] and game.meals == []
+    assert game.ended_at_utc is None and game.winners is None and game.loser is None
+
+    with pytest.raises(ConflictError):
+        await storage.start_game(GameBase(room_id=room_id, players=["carol"]))
+
+    closed = await storage.close_game(game.id)
+    assert closed is not None and closed.is_active is False and closed.ended_at_utc is not None
+    assert (await storage.start_game(GameBase(room_id=room_id, players=["carol"]))).is_active is True
+
+async def test_end_game_keeps_game_active(storage: Storage):
+    room_id = await _new_room(storage)
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice", "bob"]))
+    ended = await storage.end_game(GameEndedModel(id=game.id, winners=["bob"], loser="alice"))
+    assert ended is not None and ended.winners == ["bob"] and ended.loser == "alice"
+    assert ended.is_active is True
+    assert await storage.end_game(GameEndedModel(id=_unique("missing"), winners=[], loser="x")) is None
+
+async def test_close_game_is_idempotent(storage: Storage):
+    room_id = await _new_room(storage)
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice"]))
+    first = await storage.close_game(game.id)
+    second = await storage.close_game(game.id)
+    assert first is not None and second is not None
+    assert first.is_active is False and second.ended_at_utc == first.ended_at_utc
+    assert await storage.close_game(_unique("missing")) is None
+
+async def test_meals(storage: Storage):
+    room_id = await _new_room(storage)
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice", "bob"]))
+
+    def meal(player: str, game_id: Optional[str] = game.id) -> MealModel:
+        return MealModel(player=player, amount=12.5, currency="EUR", game_id=game_id)
+
+    with pytest.raises(NotFoundError):
+        await storage.submit_meal(meal("alice", _unique("missing")))
+    with pytest.raises(ConflictError):
+        await storage.submit_meal(meal("mallory"))
+
+    assert await storage.submit_meal(meal("alice")) == meal("alice")
+    with pytest.raises(ConflictError):
+        await storage.submit_meal(meal("alice"))
+    unfinished = await storage.get_game(game.id)
+    assert unfinished is not None and unfinished.is_active is True
+
+    await storage.submit_meal(meal("bob"))
+    finished = await storage.get_game(game.id)
+    assert finished is not None and finished.meals is not None
+    assert finished.is_active is False and finished.ended_at_utc is not None
+    assert sorted(m.player for m in finished.meals) == ["alice", "bob"]
+    assert all(m.amount == 12.5 and m.currency == "EUR" and m.game_id == game.id for m in finished.meals)
+
+async def test_history(storage: Storage):
+    room_id = await _new_room(storage)
+    finished_ids = []
+    for _ in range(3):
+        game = await storage.start_game(GameBase(room_id=room_id, players=["alice"]))
+        await storage.close_game(game.id)
+        finished_ids.append(game.id)
+    active = await storage.start_game(GameBase(room_id=room_id, players=["alice"]))
+
+    history = await storage.get_history()
+    ids = [game.id for game in history]
+    assert set(finished_ids) <= set(ids) and active.id not in ids
+    assert all(not game.is_active for game in history)
+    ended = [game.ended_at_utc for game in history if game.ended_at_utc is not None]
+    assert ended == sorted(ended, reverse=True)
+
+    assert len(await storage.get_history(limit=2)) == 2
+    assert await storage.get_game(_unique("missing")) is None
+
+async def test_history_json_matches_models(storage: Storage):
+    room_id = await _new_room(storage)
+    for players in (["alice"], ["alice", "bob"]):
+        game = await storage.start_game(GameBase(room_id=room_id, players=players))
+        await storage.end_game(GameEndedModel(id=game.id, winners=players[1:], loser="alice"))
+        for player in players:
+            await storage.submit_meal(MealModel(player=player, amount=12.5, currency="EUR", game_id=game.id))
+
+    encoded = json.loads(await storage.get_history_json(limit=5))
+    assert encoded == json.loads(game_list_adapter.dump_json(await storage.get_history(limit=5)))
+    assert json.loads(await storage.get_history_json(limit=0)) == []
+
+async def test_read_paths_agree(storage: Storage):
+    room_id = await _new_room(storage)
+    game = await storage.start_game(GameBase(room_id=room_id, players=["alice", "bob"]))
+    await storage.end_game(GameEndedModel(id=game.id, winners=["bob"], loser="alice"))
+    for player in ("alice", "bob"):
+        await storage.submit_meal(MealModel(player=player, amount=12.5, currency="EUR", game_id=game.id))
+
+    read = await storage.get_game(game.id)
+    # Other games may have ended in the same second, so look it up by id.
+    assert read in await storage.get_history()
+    assert read is not None and read.winners == ["bob"] and read.loser == "alice"
+    assert read.meals is not None and sorted(meal.player for meal in read.meals) == ["alice", "bob"]
+    room = await storage.get_room(room_id)
+    assert room is not None and room in await storage.list_rooms(is_active=room.is_active)
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from lunch_app.modules.timer_wheel import TimerWheel
+
+def test_timer_fires_on_its_tick():
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    wheel.schedule(3, fired.append, "a")
+    wheel.advance(2)
+    assert fired == []
+    wheel.advance(3)
+    assert fired == ["a"] and wheel.pending == 0
+
+def test_timers_beyond_one_rotation_wait_for_their_round():
+    wheel = TimerWheel(tick=1, slots=4)
+    fired = []
+    wheel.schedule(2, fired.append, "near")
+    wheel.schedule(6, fired.append, "far")
+    wheel.advance(2)
+    assert fired == ["near"]
+    wheel.advance(5)
+    assert fired == ["near"]
+    wheel.advance(6)
+    assert fired == ["near", "far"]
+
+def test_cancelled_timer_does_not_fire():
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    timer = wheel.schedule(1, fired.append, "a")
+    timer.cancel()
+    timer.cancel()
+    assert wheel.pending == 0
+    wheel.advance(4)
+    assert fired == []
+
+def test_zero_delay_fires_on_next_tick():
+    wheel = TimerWheel(tick=1, slots=8)
+    fired = []
+    wheel.schedule(0, fired.append, "a")
+    wheel.advance(1)
+    assert fired == ["a"]
+
+@pytest.mark.anyio
+async def test_running_wheel_fires_coroutine_callbacks():
+    wheel = TimerWheel(tick=0.01, slots=16)
+    done = asyncio.Event()
+
+    async def callback():
+        done.set()
+
+    wheel.start()
+    wheel.schedule(0.03, callback)
+    await asyncio.wait_for(done.wait(), 1)
+    await wheel.stop()